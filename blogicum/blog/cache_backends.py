@@ -0,0 +1,378 @@
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class LocalStore:
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def pop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+        return entry
+
+
+# Локальный уровень общий для всех потоков процесса, как у LocMemCache.
+LOCAL_STORES = {}
+
+
+class TwoTierCache(BaseCache):
+    """Ограниченный по объёму LRU в памяти процесса перед общим кешем.
+
+    Все записи сначала попадают в общий кеш (SHARED_ALIAS), локальная
+    копия живёт не дольше LOCAL_TIMEOUT. Ключи с префиксами из
+    SHARED_ONLY_PREFIXES (версии, счётчики) читаются только из общего
+    кеша, поэтому смена версии сразу видна всем рабочим процессам.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED_ALIAS', 'shared')
+        self.max_bytes = options.get('MAX_BYTES', 16 * 1024 * 1024)
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 60)
+        self.shared_only_prefixes = tuple(
+            options.get('SHARED_ONLY_PREFIXES', ())
+        )
+        self.store = LOCAL_STORES.setdefault(name, LocalStore())
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def is_shared_only(self, key):
+        return key.startswith(self.shared_only_prefixes)
+
+    def local_get(self, key, version):
+        local_key = self.make_key(key, version)
+        with self.store.lock:
+            entry = self.store.entries.get(local_key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                self.store.pop(local_key)
+                return None
+            self.store.entries.move_to_end(local_key)
+        return pickle.loads(value)
+
+    def local_set(self, key, value, timeout, version):
+        if self.is_shared_only(key):
+            return
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is not None:
+            timeout = min(timeout - time.time(), self.local_timeout)
+        else:
+            timeout = self.local_timeout
+        if timeout <= 0:
+            return
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(value) > self.max_bytes:
+            return
+        local_key = self.make_key(key, version)
+        with self.store.lock:
+            self.store.pop(local_key)
+            self.store.entries[local_key] = (time.monotonic() + timeout, value)
+            self.store.size += len(value)
+            while self.store.size > self.max_bytes:
+                self.store.pop(next(iter(self.store.entries)))
+
+    def local_delete(self, key, version):
+        with self.store.lock:
+            self.store.pop(self.make_key(key, version))
+
+    def get(self, key, default=None, version=None):
+        if not self.is_shared_only(key):
+            value = self.local_get(key, version)
+            if value is not None:
+                return value
+        value = self.shared.get(key, default, version=version)
+        if value is not default:
+            self.local_set(key, value, DEFAULT_TIMEOUT, version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = []
+        for key in keys:
+            value = None
+            if not self.is_shared_only(key):
+                value = self.local_get(key, version)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            shared = self.shared.get_many(missing, version=version)
+            for key, value in shared.items():
+                self.local_set(key, value, DEFAULT_TIMEOUT, version)
+            found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self.local_set(key, value, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self.local_set(key, value, timeout, version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        # Только общий кеш: add() служит блокировкой между процессами.
+        return self.shared.add(key, value, timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self.local_delete(key, version)
+        return self.shared.incr(key, delta, version=version)
+
+    def has_key(self, key, version=None):
+        return (
+            not self.is_shared_only(key)
+            and self.local_get(key, version) is not None
+        ) or self.shared.has_key(key, version=version)  # noqa: W601
+
+    def delete(self, key, version=None):
+        self.local_delete(key, version)
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.local_delete(key, version)
+        self.shared.delete_many(keys, version=version)
+
+    def clear(self):
+        with self.store.lock:
+            self.store.entries.clear()
+            self.store.size = 0
+        self.shared.clear()
+
+
+INT64_RANGE = range(-2 ** 63, 2 ** 63)
+# INSERT ... ON CONFLICT DO UPDATE появился в SQLite 3.24, RETURNING — в 3.35.
+SQLITE_UPSERT = sqlite3.sqlite_version_info >= (3, 24)
+SQLITE_RETURNING = sqlite3.sqlite_version_info >= (3, 35)
+# Ключей в одном запросе: старые сборки SQLite ограничены 999 параметрами.
+KEYS_PER_QUERY = 500
+
+
+def encode_value(value):
+    # Целые числа хранятся как INTEGER, чтобы incr() выполнялся в SQL.
+    if type(value) is int and value in INT64_RANGE:
+        return value
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def decode_value(value):
+    return value if isinstance(value, int) else pickle.loads(value)
+
+
+def in_list(values):
+    return ', '.join('?' * len(values))
+
+
+class SQLiteCache(BaseCache):
+    """Общий для рабочих процессов кеш в файле SQLite.
+
+    add() и incr() выполняются одним SQL-запросом, поэтому блокировки
+    single_flight и номера версий не теряются при одновременных
+    обращениях из разных потоков и процессов.
+    """
+
+    cull_every = 100
+
+    def __init__(self, location, params):
+        if not SQLITE_UPSERT:
+            raise ImproperlyConfigured(
+                'SQLiteCache требует SQLite 3.24 или новее, установлена '
+                f'{sqlite3.sqlite_version}.'
+            )
+        super().__init__(params)
+        self.location = str(location)
+        self.local = threading.local()
+        self.writes = 0
+
+    @property
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            Path(self.location).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.location, timeout=30, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, '
+                'value BLOB NOT NULL, expires REAL)'
+            )
+            self.local.connection = connection
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def get_key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def get(self, key, default=None, version=None):
+        row = self.connection.execute(
+            'SELECT value FROM cache '
+            'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self.get_key(key, version), time.time()),
+        ).fetchone()
+        return default if row is None else decode_value(row[0])
+
+    def get_many(self, keys, version=None):
+        keys = {self.get_key(key, version): key for key in keys}
+        made_keys = list(keys)
+        found = {}
+        for start in range(0, len(made_keys), KEYS_PER_QUERY):
+            chunk = made_keys[start:start + KEYS_PER_QUERY]
+            rows = self.connection.execute(
+                f'SELECT key, value FROM cache WHERE key IN ({in_list(chunk)})'
+                ' AND (expires IS NULL OR expires > ?)',
+                (*chunk, time.time()),
+            )
+            for made_key, value in rows:
+                found[keys[made_key]] = decode_value(value)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        rows = [
+            (self.get_key(key, version), encode_value(value), expires)
+            for key, value in data.items()
+        ]
+        # Одна транзакция на все ключи вместо отдельной на каждый.
+        with self.transaction() as connection:
+            connection.executemany(
+                'INSERT INTO cache (key, value, expires) VALUES (?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE '
+                'SET value = excluded.value, expires = excluded.expires',
+                rows,
+            )
+        self.cull()
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        # Существующая запись заменяется, только если её срок истёк.
+        now = time.time()
+        cursor = self.connection.execute(
+            'INSERT INTO cache (key, value, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE '
+            'SET value = excluded.value, expires = excluded.expires '
+            'WHERE cache.expires IS NOT NULL AND cache.expires <= ?',
+            (
+                self.get_key(key, version),
+                encode_value(value),
+                self.get_backend_timeout(timeout),
+                now,
+            ),
+        )
+        self.cull()
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        made_key = self.get_key(key, version)
+        update = (
+            'UPDATE cache SET value = value + ? '
+            'WHERE key = ? AND (expires IS NULL OR expires > ?) '
+            "AND typeof(value) = 'integer'"
+        )
+        params = (delta, made_key, time.time())
+        if SQLITE_RETURNING:
+            row = self.connection.execute(
+                f'{update} RETURNING value', params
+            ).fetchone()
+        else:
+            # Без RETURNING новое значение читается в той же транзакции.
+            with self.transaction() as connection:
+                row = connection.execute(update, params).rowcount and (
+                    connection.execute(
+                        'SELECT value FROM cache WHERE key = ?', (made_key,)
+                    ).fetchone()
+                )
+        if not row:
+            raise ValueError(f"Key '{key}' not found")
+        return row[0]
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        cursor = self.connection.execute(
+            'UPDATE cache SET expires = ? '
+            'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (
+                self.get_backend_timeout(timeout),
+                self.get_key(key, version),
+                time.time(),
+            ),
+        )
+        return cursor.rowcount == 1
+
+    def has_key(self, key, version=None):
+        return self.get(key, version=version) is not None
+
+    def delete(self, key, version=None):
+        cursor = self.connection.execute(
+            'DELETE FROM cache WHERE key = ?', (self.get_key(key, version),)
+        )
+        return cursor.rowcount == 1
+
+    def delete_many(self, keys, version=None):
+        made_keys = [self.get_key(key, version) for key in keys]
+        for start in range(0, len(made_keys), KEYS_PER_QUERY):
+            chunk = made_keys[start:start + KEYS_PER_QUERY]
+            self.connection.execute(
+                f'DELETE FROM cache WHERE key IN ({in_list(chunk)})', chunk
+            )
+
+    def clear(self):
+        self.connection.execute('DELETE FROM cache')
+
+    def cull(self):
+        self.writes += 1
+        if self.writes % self.cull_every:
+            return
+        connection = self.connection
+        connection.execute(
+            'DELETE FROM cache WHERE expires <= ?', (time.time(),)
+        )
+        count = connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count > self._max_entries:
+            # Записи без срока (версии) вытесняются последними.
+            connection.execute(
+                'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                'ORDER BY expires IS NULL, expires LIMIT ?)',
+                (count // self._cull_frequency,),
+            )
@@ -0,0 +1,122 @@
+import hashlib
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+POSTS_VERSION = 'posts'
+CONTENT_VERSION = 'content'
+CARDS_VERSION = 'cards'
+
+
+def get_version(name):
+    key = f'blog:version:{name}'
+    version = cache.get(key)
+    if version is None:
+        # Начальное значение зависит от времени, чтобы после вытеснения
+        # ключа из кеша не вернуться к уже использованной версии.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(names):
+    keys = {name: f'blog:version:{name}' for name in names}
+    found = cache.get_many(keys.values())
+    return [
+        found[keys[name]] if keys[name] in found else get_version(name)
+        for name in names
+    ]
+
+
+def bump_version(*names):
+    for name in names:
+        key = f'blog:version:{name}'
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def bump_version_on_commit(*names, using=None):
+    """Меняет версии после фиксации текущей транзакции.
+
+    До фиксации другие запросы ещё видят старые данные и могли бы
+    закешировать их под новой версией, поэтому решающей считается смена
+    после фиксации. Внутри транзакции версии меняются и сразу: так сама
+    транзакция не читает из кеша то, что уже изменила.
+    """
+    if transaction.get_connection(using).in_atomic_block:
+        bump_version(*names)
+    transaction.on_commit(lambda: bump_version(*names), using=using)
+
+
+def make_key(prefix, *parts):
+    digest = hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return f'blog:{prefix}:{digest}'
+
+
+def should_refresh_early(delta, expires, beta):
+    # XFetch: чем дольше пересчёт и ближе срок, тем вероятнее
+    # обновить значение заранее, пока остальные читают текущее.
+    jitter = -delta * beta * math.log(1 - random.random())
+    return time.time() + jitter >= expires
+
+
+def regenerate(key, generate, timeout, stale_key, lock_key):
+    try:
+        started = time.monotonic()
+        value = generate()
+        if value is not None:
+            delta = time.monotonic() - started
+            cache.set(key, (value, delta, time.time() + timeout), timeout)
+            if stale_key:
+                cache.set(stale_key, value, settings.CACHE_STALE_TIMEOUT)
+        return value
+    finally:
+        cache.delete(lock_key)
+
+
+def wait_for(key):
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+
+
+def single_flight(key, generate, timeout, stale_key=None):
+    """Значение из кеша, которое пересчитывает только один процесс.
+
+    generate() возвращает значение для кеша или None, если результат
+    кешировать нельзя. Пока один процесс держит блокировку и пересчитывает
+    значение, остальные отдают предыдущую версию из stale_key или недолго
+    ждут нового значения.
+    """
+    lock_key = f'{key}:lock'
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expires = entry
+        if (
+            should_refresh_early(
+                delta, expires, settings.CACHE_EARLY_EXPIRY_BETA
+            )
+            and cache.add(lock_key, 1, settings.CACHE_LOCK_TIMEOUT)
+        ):
+            return regenerate(key, generate, timeout, stale_key, lock_key)
+        return value
+    if cache.add(lock_key, 1, settings.CACHE_LOCK_TIMEOUT):
+        return regenerate(key, generate, timeout, stale_key, lock_key)
+    stale = cache.get(stale_key) if stale_key else None
+    if stale is not None:
+        return stale
+    value = wait_for(key)
+    if value is not None:
+        return value
+    return generate()
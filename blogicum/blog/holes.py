@@ -0,0 +1,26 @@
+import re
+
+from django.core import signing
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+HOLE_RE = re.compile(rb'<!--hole:([\w:.\-]+)-->')
+SIGNING_SALT = 'blog.holes'
+
+
+def render_hole(template_name, values, request):
+    return render_to_string(template_name, values, request=request)
+
+
+def make_placeholder(template_name, values):
+    payload = signing.dumps([template_name, values], salt=SIGNING_SALT)
+    return mark_safe(f'<!--hole:{payload}-->')
+
+
+def fill_holes(content, request):
+    def replace(match):
+        template_name, values = signing.loads(
+            match.group(1).decode(), salt=SIGNING_SALT
+        )
+        return render_hole(template_name, values, request).encode()
+    return HOLE_RE.sub(replace, content)
@@ -0,0 +1,133 @@
+import logging
+import os
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .images import process_post_image
+from .models import ImageTask
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_image(post):
+    ImageTask.objects.update_or_create(
+        publication=post,
+        defaults={
+            'source': post.image.name,
+            'run_after': timezone.now(),
+            'attempts': 0,
+            'failed': False,
+            'last_error': '',
+        },
+    )
+    transaction.on_commit(image_worker.wake)
+
+
+def claim_task():
+    # Взятая задача откладывается на IMAGE_TASK_LEASE: если процесс
+    # упадёт посреди обработки, её подхватит другой рабочий поток.
+    now = timezone.now()
+    candidates = ImageTask.objects.filter(
+        failed=False, run_after__lte=now
+    )[:10]
+    for task in candidates:
+        claimed = ImageTask.objects.filter(
+            pk=task.pk, run_after=task.run_after
+        ).update(
+            run_after=now + timedelta(seconds=settings.IMAGE_TASK_LEASE),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            task.attempts += 1
+            return task
+
+
+def retry_later(task, error):
+    if task.attempts >= settings.IMAGE_TASK_MAX_ATTEMPTS:
+        changes = {'failed': True}
+    else:
+        delay = settings.IMAGE_TASK_RETRY_DELAY * 2 ** (task.attempts - 1)
+        changes = {'run_after': timezone.now() + timedelta(seconds=delay)}
+    ImageTask.objects.filter(pk=task.pk, source=task.source).update(
+        last_error=str(error), **changes
+    )
+
+
+def run_task(task):
+    try:
+        process_post_image(task.publication)
+    except Exception as error:
+        logger.exception('Не удалось обработать изображение %s', task.source)
+        retry_later(task, error)
+    else:
+        # Если за время обработки загрузили новый файл, задача
+        # уже перезаписана и остаётся в очереди.
+        ImageTask.objects.filter(pk=task.pk, source=task.source).delete()
+
+
+def run_next_task():
+    task = claim_task()
+    if task is None:
+        return False
+    run_task(task)
+    return True
+
+
+def run_pending():
+    processed = 0
+    while run_next_task():
+        processed += 1
+    return processed
+
+
+class ImageWorker:
+
+    def __init__(self, threads, poll_interval):
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.pid = None
+
+    def ensure_started(self):
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                for number in range(self.threads):
+                    threading.Thread(
+                        target=self.run,
+                        name=f'blog-images-{number}',
+                        daemon=True,
+                    ).start()
+
+    def wake(self):
+        self.wakeup.set()
+
+    def step(self):
+        close_old_connections()
+        try:
+            return run_next_task()
+        except DatabaseError:
+            logger.exception('Не удалось получить задачу обработки')
+            return False
+        finally:
+            close_old_connections()
+
+    def run(self):
+        while True:
+            if not self.step():
+                self.wakeup.wait(self.poll_interval)
+                self.wakeup.clear()
+
+
+image_worker = ImageWorker(
+    threads=settings.IMAGE_WORKERS,
+    poll_interval=settings.IMAGE_WORKER_POLL,
+)
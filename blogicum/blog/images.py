@@ -0,0 +1,138 @@
+import logging
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image
+
+from .caching import CONTENT_VERSION, bump_version
+from .models import WEBP_MIME_TYPE, Post, PostImageVariant
+
+logger = logging.getLogger(__name__)
+
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 80, 'method': 4},
+}
+EXTENSIONS = {'WEBP': '.webp'}
+
+
+def get_mime_type(image_format):
+    # Модули форматов Pillow загружает лениво, вместе с их MIME-типами.
+    Image.init()
+    return Image.MIME[image_format]
+
+
+def encode_image(image, image_format):
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, image_format, **SAVE_OPTIONS.get(image_format, {}))
+    return buffer.getvalue()
+
+
+def resize_image(original, width):
+    copy = original.copy()
+    copy.thumbnail((width, original.height), Image.LANCZOS)
+    return copy
+
+
+def variant_name(source, width, image_format):
+    path = PurePosixPath(source)
+    suffix = EXTENSIONS.get(image_format, path.suffix)
+    return f'{path.stem}_{width}w{suffix}'
+
+
+def variant_targets(original):
+    widths = [
+        width for width in settings.POST_IMAGE_WIDTHS
+        if width < original.width
+    ]
+    targets = [(width, original.format) for width in widths]
+    if settings.POST_IMAGE_WEBP and original.format != 'WEBP':
+        # WebP-копия оригинального размера заменяет его в <picture>.
+        targets += [(width, 'WEBP') for width in widths + [original.width]]
+    return targets
+
+
+def make_variants(post, original, size):
+    existing = {}
+    for width, mime_type, variant_size in post.image_variants.filter(
+        source=post.image.name
+    ).values_list('width', 'mime_type', 'size'):
+        existing[width, mime_type] = variant_size
+    # Объёмы копий в исходном формате: WebP-версия, которая не меньше
+    # копии той же ширины, не строится.
+    source_sizes = {original.width: size}
+    for width, image_format in variant_targets(original):
+        mime_type = get_mime_type(image_format)
+        if (width, mime_type) in existing:
+            source_sizes.setdefault(width, existing[width, mime_type])
+            continue
+        resized = resize_image(original, width)
+        content = encode_image(resized, image_format)
+        if image_format == original.format:
+            source_sizes[width] = len(content)
+        elif len(content) >= source_sizes.get(width, len(content) + 1):
+            continue
+        variant = PostImageVariant(
+            publication=post,
+            source=post.image.name,
+            mime_type=mime_type,
+            width=resized.width,
+            height=resized.height,
+            size=len(content),
+        )
+        variant.image.save(
+            variant_name(post.image.name, width, image_format),
+            ContentFile(content),
+            save=False,
+        )
+        variant.save()
+
+
+def process_post_image(post):
+    """Строит уменьшенные копии и WebP-версии изображения публикации.
+
+    Копии для прежнего файла удаляются, размеры, формат и объём оригинала
+    и имя обработанного файла сохраняются в публикации.
+    """
+    source = post.image.name
+    for variant in post.image_variants.exclude(source=source):
+        variant.delete()
+    info = {'source': source}
+    if source:
+        storage = post.image.storage
+        with storage.open(source, 'rb') as file:
+            with Image.open(file) as original:
+                info['width'], info['height'] = original.size
+                info['mime_type'] = get_mime_type(original.format)
+                info['size'] = storage.size(source)
+                make_variants(post, original, info['size'])
+    Post.objects.filter(pk=post.pk).update(
+        image_info=info, updated_at=timezone.now()
+    )
+    post.image_info = info
+    bump_version(CONTENT_VERSION)
+
+
+def webp_savings(posts):
+    """Сколько байт экономит WebP-версия оригинала у публикаций posts."""
+    total = 0
+    for post in posts:
+        webp = [
+            variant for variant in post.image_variants.all()
+            if variant.source == post.image.name
+            and variant.mime_type == WEBP_MIME_TYPE
+            and variant.width == post.image_info.get('width')
+        ]
+        if webp and 'size' in post.image_info:
+            total += max(post.image_info['size'] - webp[0].size, 0)
+    return total
+
+
+def needs_processing(post):
+    return not post.image_is_processed
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from blog.caching import CARDS_VERSION, CONTENT_VERSION, bump_version
+from blog.models import Post, make_excerpt
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает сохранённые отрывки публикаций, '
+            'читая тексты частями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        total = 0
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'text')[:batch_size]
+            )
+            if not posts:
+                break
+            for post in posts:
+                post.excerpt = make_excerpt(post.text)
+            # bulk_update не трогает updated_at и не вызывает сигналы.
+            Post.objects.bulk_update(posts, ['excerpt'])
+            last_pk = posts[-1].pk
+            total += len(posts)
+        # Ключи карточек не зависят от отрывка: сбрасываем их и страницы.
+        bump_version(CARDS_VERSION, CONTENT_VERSION)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено отрывков: {total}'
+        ))
@@ -0,0 +1,123 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db import transaction
+from django.test.utils import override_settings
+
+# Временная база с настройками основной: соединения открываются Django,
+# поэтому к ним применяются SQLITE_PRAGMAS и остальные обработчики
+# connection_created, как на сайте.
+BENCHMARK_ALIAS = 'benchmark'
+
+
+class Benchmark:
+
+    def __init__(self, path, seconds):
+        self.path = path
+        self.seconds = seconds
+        self.counters = {'reads': 0, 'writes': 0, 'errors': 0}
+        self.lock = threading.Lock()
+
+    def setup(self):
+        connections.databases[BENCHMARK_ALIAS] = {
+            **connections.databases[DEFAULT_DB_ALIAS],
+            'NAME': self.path,
+        }
+        with connections[BENCHMARK_ALIAS].cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE benchmark_comment '
+                '(id INTEGER PRIMARY KEY, text TEXT)'
+            )
+            cursor.executemany(
+                'INSERT INTO benchmark_comment (text) VALUES (%s)',
+                [('Комментарий',)] * 1000,
+            )
+
+    def teardown(self):
+        connections[BENCHMARK_ALIAS].close()
+        del connections[BENCHMARK_ALIAS]
+        del connections.databases[BENCHMARK_ALIAS]
+
+    def read(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT COUNT(*) FROM benchmark_comment WHERE id > %s', (500,)
+            )
+            cursor.fetchone()
+        return 'reads'
+
+    def write(self, connection):
+        with transaction.atomic(using=BENCHMARK_ALIAS):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'INSERT INTO benchmark_comment (text) VALUES (%s)',
+                    ('Комментарий',),
+                )
+        return 'writes'
+
+    def worker(self, operation, deadline):
+        # У каждого потока своё соединение Django с базой.
+        connection = connections[BENCHMARK_ALIAS]
+        while time.monotonic() < deadline:
+            try:
+                key = operation(connection)
+            except OperationalError:
+                key = 'errors'
+            with self.lock:
+                self.counters[key] += 1
+        connection.close()
+
+    def run(self, readers, writers):
+        self.setup()
+        try:
+            deadline = time.monotonic() + self.seconds
+            threads = [
+                threading.Thread(
+                    target=self.worker, args=(operation, deadline)
+                )
+                for operation in (
+                    [self.read] * readers + [self.write] * writers
+                )
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            self.teardown()
+        return {
+            key: value / self.seconds for key, value in self.counters.items()
+        }
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность SQLite при параллельных '
+            'чтениях и записях без настроек и с SQLITE_PRAGMAS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+
+    def handle(self, *args, **options):
+        profiles = {
+            'по умолчанию': {},
+            'SQLITE_PRAGMAS': settings.SQLITE_PRAGMAS,
+        }
+        for title, pragmas in profiles.items():
+            with tempfile.TemporaryDirectory() as directory, \
+                    override_settings(SQLITE_PRAGMAS=pragmas):
+                result = Benchmark(
+                    str(Path(directory) / 'benchmark.sqlite3'),
+                    options['seconds'],
+                ).run(options['readers'], options['writers'])
+            self.stdout.write(
+                f'{title}: чтений/с {result["reads"]:.0f}, '
+                f'записей/с {result["writes"]:.0f}, '
+                f'ошибок блокировки/с {result["errors"]:.1f}'
+            )
@@ -0,0 +1,95 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import RequestFactory
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post, User
+from blog.paginators import CursorPaginator
+from blog.utils import get_comments_paginator
+from blog.views import PostListView, PostsCategoryView, PostsUserView
+
+
+def get_view(view_class, user=None, **attributes):
+    request = RequestFactory().get('/')
+    request.user = user or AnonymousUser()
+    view = view_class()
+    view.setup(request)
+    for name, value in attributes.items():
+        setattr(view, name, value)
+    return view
+
+
+def get_page_querysets(paginator, last_object):
+    """Первая страница и переход по курсору после last_object."""
+    cursor = paginator.encode_cursor(last_object, paginator.forward)
+    yield paginator.get_page_queryset()[0]
+    yield paginator.get_page_queryset(cursor)[0]
+
+
+def get_view_querysets():
+    """Запросы страниц, построенные самими представлениями."""
+    author = User(pk=0)
+    views = {
+        'blog:index': get_view(PostListView),
+        'blog:category_posts': get_view(
+            PostsCategoryView, object=Category(pk=0)
+        ),
+        'blog:profile': get_view(PostsUserView, object=author),
+        'blog:profile (автор)': get_view(
+            PostsUserView, user=author, object=author
+        ),
+    }
+    now = timezone.now()
+    for view_name, view in views.items():
+        queryset = view.get_queryset()
+        yield view_name, queryset[:view.paginate_by]
+        for page in get_page_querysets(
+            CursorPaginator(queryset, view.paginate_by),
+            Post(pk=0, pub_date=now),
+        ):
+            yield view_name, page
+    for page in get_page_querysets(
+        get_comments_paginator(Post(pk=0)), Comment(pk=0, created_at=now)
+    ):
+        yield 'blog:post_detail', page
+
+
+def explain_query_plan(queryset, using=DEFAULT_DB_ALIAS):
+    sql, params = queryset.query.sql_with_params()
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def find_table_scans(using=DEFAULT_DB_ALIAS):
+    scans = []
+    for view_name, queryset in get_view_querysets():
+        for detail in explain_query_plan(queryset, using=using):
+            if detail.startswith('SCAN'):
+                scans.append((view_name, detail))
+    return scans
+
+
+class Command(BaseCommand):
+    help = ('Проверяет планы запросов лент и комментариев '
+            'и завершается с ошибкой при полном просмотре таблицы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN поддерживается '
+                               'только для SQLite.')
+        scans = find_table_scans(using=using)
+        for view_name, detail in scans:
+            self.stderr.write(f'{view_name}: {detail}')
+        if scans:
+            raise CommandError(
+                'Найдены запросы с полным просмотром таблицы.'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'Все запросы представлений используют индексы.'
+        ))
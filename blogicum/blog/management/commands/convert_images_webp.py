@@ -0,0 +1,38 @@
+from django.db.models import Exists, OuterRef
+from django.template.defaultfilters import filesizeformat
+
+from blog.images import webp_savings
+from blog.models import WEBP_MIME_TYPE, Post, PostImageVariant
+
+from .generate_image_variants import Command as GenerateCommand
+
+
+class Command(GenerateCommand):
+    help = ('Строит WebP-версии изображений публикаций, у которых их ещё '
+            'нет, и выводит, сколько байт они экономят.')
+
+    def get_pks(self, rebuild):
+        if rebuild:
+            return super().get_pks(rebuild)
+        webp = PostImageVariant.objects.filter(
+            publication=OuterRef('pk'),
+            source=OuterRef('image'),
+            mime_type=WEBP_MIME_TYPE,
+        )
+        return list(
+            Post.objects.exclude(image='')
+            .exclude(Exists(webp))
+            .values_list('pk', flat=True)
+        )
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+        posts = Post.objects.filter(
+            pk__in=[pk for pk, error in self.results if not error]
+        ).only('pk', 'image', 'image_info').prefetch_related(
+            'image_variants'
+        )
+        saved = webp_savings(posts)
+        self.stdout.write(self.style.SUCCESS(
+            f'WebP экономит: {filesizeformat(saved)} ({saved} байт)'
+        ))
@@ -0,0 +1,58 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from blog.images import needs_processing, process_post_image
+from blog.models import Post, PostImageVariant
+
+
+def process_pk(pk):
+    close_old_connections()
+    post = Post.objects.get(pk=pk)
+    try:
+        process_post_image(post)
+    except OSError as error:
+        return pk, str(error)
+    return pk, None
+
+
+class Command(BaseCommand):
+    help = ('Строит уменьшенные копии изображений публикаций '
+            'в нескольких процессах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Число процессов; 0 — в текущем процессе.')
+        parser.add_argument('--all', action='store_true',
+                            help='Перестроить копии и для обработанных.')
+
+    def get_pks(self, rebuild):
+        posts = Post.objects.exclude(image='').only(
+            'pk', 'image', 'image_info'
+        )
+        return [
+            post.pk for post in posts.iterator()
+            if rebuild or needs_processing(post)
+        ]
+
+    def process(self, pks, workers):
+        if not workers:
+            return [process_pk(pk) for pk in pks]
+        # Дочерние процессы не должны разделять открытые соединения.
+        connections.close_all()
+        with ProcessPoolExecutor(workers) as executor:
+            return list(executor.map(process_pk, pks, chunksize=8))
+
+    def handle(self, *args, **options):
+        pks = self.get_pks(options['all'])
+        if options['all']:
+            PostImageVariant.objects.filter(publication__in=pks).delete()
+        self.results = results = self.process(pks, options['workers'])
+        failed = [(pk, error) for pk, error in results if error]
+        for pk, error in failed:
+            self.stderr.write(f'Публикация {pk}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {len(results) - len(failed)}, '
+            f'ошибок: {len(failed)}'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.image_tasks import image_worker, run_pending
+
+
+class Command(BaseCommand):
+    help = ('Выполняет задачи обработки изображений из очереди. '
+            'Запускайте по cron, если фоновые потоки отключены.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true',
+                            help='Работать постоянно, как фоновый поток.')
+
+    def handle(self, *args, **options):
+        if options['watch']:
+            image_worker.run()
+        processed = run_pending()
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {processed}'
+        ))
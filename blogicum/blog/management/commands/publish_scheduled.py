@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.scheduler import publish_due, scheduler
+
+
+class Command(BaseCommand):
+    help = ('Публикует отложенные посты, срок которых наступил. '
+            'Запускайте по cron, если поток-планировщик отключён.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--watch', action='store_true',
+                            help='Работать постоянно, как поток-планировщик.')
+
+    def handle(self, *args, **options):
+        if options['watch']:
+            scheduler.run()
+        published = publish_due()
+        self.stdout.write(self.style.SUCCESS(
+            f'Опубликовано отложенных постов: {published}'
+        ))
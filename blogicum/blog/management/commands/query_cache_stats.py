@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.querycache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Выводит число попаданий и промахов кеша результатов запросов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true',
+                            help='Обнулить счётчики после вывода.')
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {ratio:.1%}'
+        )
+        if options['reset']:
+            reset_stats()
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import Post
+from blog.search import (
+    SEARCH_TABLE,
+    create_index_table,
+    index_posts,
+    is_search_available,
+    remove_missing_posts,
+    replace_index,
+)
+
+STAGING_TABLE = f'{SEARCH_TABLE}_new'
+
+
+class Command(BaseCommand):
+    help = ('Перестраивает полнотекстовый индекс публикаций в отдельной '
+            'таблице и подменяет им рабочий, не прерывая поиск.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def get_posts(self):
+        return Post.objects.only('pk', 'title', 'text')
+
+    def handle(self, *args, **options):
+        if not is_search_available():
+            raise CommandError('Полнотекстовый поиск доступен '
+                               'только для SQLite.')
+        batch_size = options['batch_size']
+        started = timezone.now()
+        create_index_table(STAGING_TABLE)
+        last_pk = 0
+        total = 0
+        while True:
+            posts = list(
+                self.get_posts().filter(pk__gt=last_pk)
+                .order_by('pk')[:batch_size]
+            )
+            if not posts:
+                break
+            with transaction.atomic():
+                index_posts(posts, table=STAGING_TABLE)
+            last_pk = posts[-1].pk
+            total += len(posts)
+        with transaction.atomic():
+            # Публикации, изменённые или удалённые во время перестройки,
+            # рабочий индекс уже учёл; переносим это в новую таблицу.
+            remove_missing_posts(STAGING_TABLE)
+            index_posts(
+                self.get_posts().filter(updated_at__gte=started),
+                table=STAGING_TABLE,
+            )
+            replace_index(STAGING_TABLE)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано публикаций: {total}'
+        ))
@@ -0,0 +1,118 @@
+import posixpath
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog.caching import CARDS_VERSION, CONTENT_VERSION, bump_version
+from blog.models import ImageTask, Post, PostImageVariant
+from blog.storage import content_storage
+
+
+class Command(BaseCommand):
+    help = ('Переносит изображения в раскладку по хешу содержимого '
+            'партиями. Прерванный перенос продолжается повторным запуском.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def get_pending(self, model, field):
+        # Перенесённые строки не подходят под фильтр, поэтому повторный
+        # запуск начинает с того места, где остановился прошлый.
+        layout = content_storage.get_layout_regex(field.upload_to)
+        return (
+            model._base_manager
+            .exclude(**{field.name: ''})
+            .exclude(**{f'{field.name}__regex': layout})
+            .order_by('pk')
+        )
+
+    def copy_file(self, field, name):
+        try:
+            with content_storage.open(name, 'rb') as file:
+                return content_storage.save(
+                    posixpath.join(field.upload_to, posixpath.basename(name)),
+                    file,
+                )
+        except FileNotFoundError:
+            self.stderr.write(f'Файл не найден: {name}')
+
+    def get_updated_fields(self, model, field):
+        if model is Post:
+            return [field.name, 'image_info', 'updated_at']
+        return [field.name]
+
+    def rename_sources(self, rows, renamed):
+        now = timezone.now()
+        for post in rows:
+            post.updated_at = now
+            if post.image_info.get('source') in renamed:
+                post.image_info['source'] = post.image.name
+        for old, new in renamed.items():
+            PostImageVariant.objects.filter(source=old).update(source=new)
+            ImageTask.objects.filter(source=old).update(source=new)
+
+    def copy_files(self, field, rows):
+        """Копирует файлы строк; строки без файла пропускаются."""
+        renamed = {}
+        moved = []
+        for row in rows:
+            file = getattr(row, field.name)
+            new = self.copy_file(field, file.name)
+            if new is None:
+                continue
+            renamed[file.name] = new
+            file.name = new
+            moved.append(row)
+        return renamed, moved
+
+    def move_batch(self, model, field, rows):
+        renamed, rows = self.copy_files(field, rows)
+        if not rows:
+            return 0
+        try:
+            with transaction.atomic():
+                if model is Post:
+                    self.rename_sources(rows, renamed)
+                model._base_manager.bulk_update(
+                    rows, self.get_updated_fields(model, field)
+                )
+                # Старые файлы удаляются, только когда на них не осталось
+                # ссылок.
+                for old in renamed:
+                    transaction.on_commit(
+                        lambda old=old: content_storage.delete(old)
+                    )
+        except Exception:
+            # Копии без ссылок не должны оставаться в хранилище.
+            for new in renamed.values():
+                content_storage.delete(new)
+            raise
+        bump_version(CONTENT_VERSION, CARDS_VERSION)
+        return len(renamed)
+
+    def move_field(self, model, field, batch_size):
+        moved = last_pk = 0
+        fields = self.get_updated_fields(model, field)
+        while True:
+            rows = list(
+                self.get_pending(model, field)
+                .filter(pk__gt=last_pk)
+                .only('pk', *fields)[:batch_size]
+            )
+            if not rows:
+                return moved
+            last_pk = rows[-1].pk
+            moved += self.move_batch(model, field, rows)
+            self.stdout.write(
+                f'{model._meta.label}.{field.name}: перенесено {moved}'
+            )
+
+    def handle(self, *args, **options):
+        moved = sum(
+            self.move_field(model, field, options['batch_size'])
+            for model, field in content_storage.get_file_fields()
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено файлов: {moved}'
+        ))
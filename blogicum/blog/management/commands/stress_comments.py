@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.models import Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Создаёт комментарии к публикации из нескольких потоков '
+            'и выводит пропускную способность и число ошибок.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--comments', type=int, default=50,
+                            help='Комментариев на поток.')
+        parser.add_argument('--post', type=int)
+        parser.add_argument('--username')
+        parser.add_argument('--serialize', action='store_true',
+                            help='Включить SERIALIZE_WRITES.')
+
+    def handle(self, *args, **options):
+        post = Post.objects.filter(
+            **({'pk': options['post']} if options['post'] else {})
+        ).first()
+        user = User.objects.filter(
+            **({'username': options['username']}
+               if options['username'] else {})
+        ).first()
+        if post is None or user is None:
+            raise CommandError('Нужны хотя бы одна публикация '
+                               'и один пользователь.')
+        url = reverse('blog:add_comment', kwargs={'post_id': post.pk})
+        results = Counter()
+        lock = threading.Lock()
+
+        def hammer(number):
+            client = Client()
+            client.force_login(user)
+            for index in range(options['comments']):
+                try:
+                    status = client.post(
+                        url, {'text': f'Нагрузка {number}-{index}'}
+                    ).status_code
+                except OperationalError:
+                    status = 'OperationalError'
+                with lock:
+                    results[status] += 1
+            close_old_connections()
+
+        with override_settings(
+            ALLOWED_HOSTS=['testserver'],
+            SERIALIZE_WRITES=options['serialize'],
+        ):
+            threads = [
+                threading.Thread(target=hammer, args=(number,))
+                for number in range(options['threads'])
+            ]
+            started = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started
+
+        total = sum(results.values())
+        self.stdout.write(
+            f'Запросов: {total} за {elapsed:.2f} с '
+            f'({total / elapsed:.0f} в секунду)'
+        )
+        for status, count in sorted(results.items(), key=str):
+            self.stdout.write(f'  {status}: {count}')
@@ -0,0 +1,38 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from blog.routers import invalidate_replica_reads
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в реплики для чтения '
+            'через backup API.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=1024)
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Синхронизация реплик поддерживается '
+                               'только для SQLite.')
+        source.ensure_connection()
+        for alias in settings.DATABASE_READ_REPLICAS:
+            # Копия пишется прямо в файл реплики одной транзакцией:
+            # открытые соединения в режиме WAL дочитывают прежний снимок
+            # и затем видят новую базу целиком, без подмены файла и его
+            # -wal/-shm под ними.
+            destination = sqlite3.connect(
+                str(settings.DATABASES[alias]['NAME']), timeout=30
+            )
+            try:
+                source.connection.backup(
+                    destination, pages=options['pages']
+                )
+            finally:
+                destination.close()
+            self.stdout.write(f'Реплика {alias} обновлена.')
+        invalidate_replica_reads()
@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.views.generic.detail import BaseDetailView
+from django.views.generic.edit import DeletionMixin, FormMixin
+from django.views.generic.list import BaseListView
+
+from .holes import fill_holes
+from .routers import PINNED_SESSION_KEY, is_session_pinned, use_replica
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    pinned_session_key = PINNED_SESSION_KEY
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            use_replica.set(False)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and hasattr(request, 'session')
+        ):
+            request.session[self.pinned_session_key] = (
+                time.time() + settings.READ_YOUR_WRITES_SECONDS
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        use_replica.set(
+            request.method in SAFE_METHODS
+            and view_class is not None
+            and issubclass(view_class, (BaseListView, BaseDetailView))
+            and not issubclass(view_class, (FormMixin, DeletionMixin))
+            and not is_session_pinned(request)
+        )
+
+
+class HolePunchMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if getattr(response, 'has_holes', False):
+            response.content = fill_holes(response.content, request)
+        return response
@@ -0,0 +1,51 @@
+import re
+
+import snowballstemmer
+from django.db import migrations
+
+# Копия blog.search.stem_text на момент миграции: код приложения может
+# измениться, а миграция должна выполняться так же, как прежде.
+WORD_RE = re.compile(r'\w+')
+stemmer = snowballstemmer.stemmer('russian')
+
+
+def stem_text(text):
+    return ' '.join(stemmer.stemWords(WORD_RE.findall(text.lower())))
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE blog_post_search USING fts5('
+        "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    Post = apps.get_model('blog', 'Post')
+    rows = (
+        (pk, stem_text(title), stem_text(text))
+        for pk, title, text in Post.objects.values_list(
+            'pk', 'title', 'text'
+        ).iterator()
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO blog_post_search (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            rows,
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
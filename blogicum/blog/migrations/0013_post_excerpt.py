@@ -0,0 +1,54 @@
+# Generated by Django 3.2.24 on 2026-10-18 00:10
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 1000
+# Значения на момент миграции, дальнейшие изменения пересчитывает
+# команда backfill_excerpts.
+EXCERPT_WORDS = 10
+EXCERPT_LENGTH = 256
+
+
+def make_excerpt(text):
+    return Truncator(
+        Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    ).chars(EXCERPT_LENGTH)
+
+
+def fill_excerpt(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    last_pk = 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .only('pk', 'text')[:BATCH_SIZE]
+        )
+        if not posts:
+            break
+        for post in posts:
+            post.excerpt = make_excerpt(post.text)
+        Post.objects.bulk_update(posts, ['excerpt'])
+        last_pk = posts[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=256,
+                verbose_name='Отрывок',
+            ),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.24 on 2026-10-17 23:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_scheduledpublication'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_info',
+            field=models.JSONField(default=dict, editable=False, help_text='Обработанный файл и размеры оригинала.', verbose_name='Сведения об изображении'),
+        ),
+        migrations.CreateModel(
+            name='PostImageVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=100, verbose_name='Исходный файл')),
+                ('image', models.ImageField(upload_to='post_photo/variants', verbose_name='Файл')),
+                ('width', models.PositiveIntegerField(verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='Высота')),
+                ('publication', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_variants', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'уменьшенная копия изображения',
+                'verbose_name_plural': 'Уменьшенные копии изображений',
+                'ordering': ('width',),
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.24 on 2026-10-18 03:40
+
+import mimetypes
+
+from django.db import migrations, models
+
+
+def fill_variant_details(apps, schema_editor):
+    PostImageVariant = apps.get_model('blog', 'PostImageVariant')
+    variants = list(PostImageVariant.objects.all())
+    for variant in variants:
+        variant.mime_type = mimetypes.guess_type(variant.image.name)[0] or ''
+        try:
+            variant.size = variant.image.size
+        except OSError:
+            variant.size = 0
+    PostImageVariant.objects.bulk_update(
+        variants, ['mime_type', 'size'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_imagetask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postimagevariant',
+            name='mime_type',
+            field=models.CharField(
+                default='', max_length=20, verbose_name='Тип'
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='postimagevariant',
+            name='size',
+            field=models.PositiveIntegerField(
+                default=0, verbose_name='Размер, байт'
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_variant_details, migrations.RunPython.noop),
+    ]
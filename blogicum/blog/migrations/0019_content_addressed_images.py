@@ -0,0 +1,24 @@
+# Generated by Django 3.2.24 on 2026-10-17 23:27
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_postimagevariant_webp'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, storage=blog.storage.ContentAddressedStorage(), upload_to='post_photo', verbose_name='Фотография'),
+        ),
+        migrations.AlterField(
+            model_name='postimagevariant',
+            name='image',
+            field=models.ImageField(db_index=True, storage=blog.storage.ContentAddressedStorage(), upload_to='post_photo/variants', verbose_name='Файл'),
+        ),
+    ]
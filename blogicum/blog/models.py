@@ -1,40 +1,77 @@
+import math
+import mimetypes
+from datetime import datetime
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models import Count
 from django.utils import timezone
+from django.utils.text import Truncator
 from django.urls import reverse
 
+from .querycache import CachedQuerySetMixin
+from .storage import content_storage
+
 User = get_user_model()
 
+# Поля публикации, которые обновляются только через update(): устаревшее
+# значение экземпляра при обычном сохранении не должно их затирать.
+SEPARATELY_UPDATED_FIELDS = ('comment_count', 'image_info')
+
+# Поля публикации, которые вычисляются при сохранении из других полей.
+DERIVED_FIELDS = {
+    frozenset({'text'}): 'excerpt',
+    frozenset({'is_published', 'category', 'category_id'}): 'is_visible',
+}
+
+WEBP_MIME_TYPE = 'image/webp'
+
+
+def quantize_time(value, ceil=False):
+    quantum = settings.PUBLISHED_NOW_QUANTUM
+    if not quantum:
+        return value
+    rounding = math.ceil if ceil else math.floor
+    return datetime.fromtimestamp(
+        rounding(value.timestamp() / quantum) * quantum, tz=timezone.utc
+    )
+
+
+def bucketed_now():
+    # Одинаковое значение в пределах интервала даёт одинаковый SQL
+    # у запросов лент, а значит и одинаковые ключи кеша.
+    return quantize_time(timezone.now())
 
-class PostQuerySet(models.QuerySet):
+
+def make_excerpt(text):
+    return Truncator(
+        Truncator(text).words(settings.EXCERPT_WORDS, truncate=' …')
+    ).chars(settings.MAX_FIELD_LENGTH)
+
+
+class PostQuerySet(CachedQuerySetMixin, models.QuerySet):
 
     def with_related_data(self):
         return self.select_related(
             'author', 'location', 'category'
         )
 
+    def for_feed(self):
+        return self.defer('text').prefetch_related('image_variants')
+
     def published(self):
         return self.filter(
-            models.Q(pub_date__lte=timezone.now())
-            & models.Q(is_published=True)
-            & models.Q(category__is_published=True)
-        )
-
-    def comment_count(self):
-        return self.annotate(
-            comment_count=Count('comments')
+            models.Q(pub_date__lte=bucketed_now())
+            & models.Q(is_visible=True)
         )
 
 
-class PostManager(models.Manager):
+class PostManager(models.Manager.from_queryset(PostQuerySet)):
     def get_queryset(self):
         return (
             PostQuerySet(self.model)
             .with_related_data()
             .published()
-            .comment_count()
         )
 
 
@@ -92,6 +129,12 @@ class Post(BaseModel):
         max_length=settings.MAX_FIELD_LENGTH
     )
     text = models.TextField('Текст')
+    excerpt = models.CharField(
+        'Отрывок',
+        max_length=settings.MAX_FIELD_LENGTH,
+        blank=True,
+        editable=False,
+    )
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         help_text=('Если установить дату и время в будущем'
@@ -118,8 +161,28 @@ class Post(BaseModel):
     image = models.ImageField(
         'Фотография',
         upload_to='post_photo',
+        storage=content_storage,
+        db_index=True,
         blank=True,
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    image_info = models.JSONField(
+        'Сведения об изображении',
+        default=dict,
+        editable=False,
+        help_text='Обработанный файл и размеры оригинала.',
+    )
+    is_visible = models.BooleanField(
+        'Виден в лентах',
+        default=True,
+        editable=False,
+        help_text='Опубликован сам пост и его категория.',
+    )
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
 
     objects = PostQuerySet.as_manager()
     published = PostManager()
@@ -127,12 +190,106 @@ class Post(BaseModel):
     class Meta:
         default_related_name = 'posts'
         ordering = ('-pub_date', )
+        indexes = (
+            models.Index(
+                fields=('-pub_date', 'is_visible'),
+                name='post_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_feed_idx',
+            ),
+        )
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
 
+    def save(self, *args, **kwargs):
+        deferred = self.get_deferred_fields()
+        if 'text' not in deferred:
+            self.excerpt = make_excerpt(self.text)
+        self.is_visible = (
+            self.is_published
+            and self.category_id is not None
+            and self.category.is_published
+        )
+        if (
+            self.pk is not None
+            and not self._state.adding
+            and not kwargs.get('force_insert')
+            and kwargs.get('update_fields') is None
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in SEPARATELY_UPDATED_FIELDS
+                and field.attname not in deferred
+            ]
+        elif kwargs.get('update_fields') is not None:
+            update_fields = set(kwargs['update_fields'])
+            for source, derived in DERIVED_FIELDS.items():
+                if update_fields & source:
+                    update_fields.add(derived)
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'pk': self.pk})
 
+    @property
+    def image_is_processed(self):
+        return self.image_info.get('source', '') == self.image.name
+
+    @property
+    def image_mime_type(self):
+        return (
+            self.image_info.get('mime_type')
+            or mimetypes.guess_type(self.image.name)[0]
+        )
+
+    def get_variant_candidates(self, mime_type):
+        return [
+            f'{variant.image.url} {variant.width}w'
+            for variant in self.image_variants.all()
+            if variant.source == self.image.name
+            and variant.mime_type == mime_type
+        ]
+
+    @property
+    def image_srcset(self):
+        """Значение srcset для уменьшенных копий и оригинала.
+
+        Пока копии не построены, возвращается пустая строка и шаблоны
+        показывают только оригинал.
+        """
+        if not self.image or not self.image_is_processed:
+            return ''
+        candidates = self.get_variant_candidates(self.image_mime_type)
+        if candidates:
+            candidates.append(
+                f'{self.image.url} {self.image_info["width"]}w'
+            )
+        return ', '.join(candidates)
+
+    @property
+    def image_webp_srcset(self):
+        if (
+            not self.image
+            or not self.image_is_processed
+            or self.image_mime_type == WEBP_MIME_TYPE
+        ):
+            return ''
+        candidates = self.get_variant_candidates(WEBP_MIME_TYPE)
+        # Без WebP-копии оригинального размера браузер взял бы для
+        # больших экранов уменьшенную, поэтому <source> не предлагается.
+        original = f' {self.image_info.get("width")}w'
+        if not any(candidate.endswith(original) for candidate in candidates):
+            return ''
+        return ', '.join(candidates)
+
 
 class Comment(models.Model):
     text = models.TextField(
@@ -153,8 +310,82 @@ class Comment(models.Model):
     class Meta:
         default_related_name = 'comments'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('publication', 'created_at'),
+                name='comment_publication_idx',
+            ),
+        )
         verbose_name = 'коментарий'
         verbose_name_plural = 'Коментарии'
 
     def __str__(self):
         return f'Комментарий от {self.author} к записи "{self.publication}"'
+
+
+class ScheduledPublication(models.Model):
+    publication = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='schedule',
+        verbose_name='Публикация'
+    )
+    publish_at = models.DateTimeField('Время публикации', db_index=True)
+
+    class Meta:
+        ordering = ('publish_at',)
+        verbose_name = 'отложенная публикация'
+        verbose_name_plural = 'Отложенные публикации'
+
+    def __str__(self):
+        return f'{self.publication} в {self.publish_at:%d.%m.%Y %H:%M}'
+
+
+class PostImageVariant(models.Model):
+    publication = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_variants',
+        verbose_name='Публикация'
+    )
+    source = models.CharField('Исходный файл', max_length=100)
+    image = models.ImageField(
+        'Файл',
+        upload_to='post_photo/variants',
+        storage=content_storage,
+        db_index=True,
+    )
+    mime_type = models.CharField('Тип', max_length=20)
+    width = models.PositiveIntegerField('Ширина')
+    height = models.PositiveIntegerField('Высота')
+    size = models.PositiveIntegerField('Размер, байт')
+
+    class Meta:
+        ordering = ('width',)
+        verbose_name = 'уменьшенная копия изображения'
+        verbose_name_plural = 'Уменьшенные копии изображений'
+
+    def __str__(self):
+        return f'{self.source} ({self.width}×{self.height})'
+
+
+class ImageTask(models.Model):
+    publication = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_task',
+        verbose_name='Публикация'
+    )
+    source = models.CharField('Исходный файл', max_length=100)
+    run_after = models.DateTimeField('Выполнить после', db_index=True)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    failed = models.BooleanField('Не удалась', default=False)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('run_after',)
+        verbose_name = 'задача обработки изображения'
+        verbose_name_plural = 'Задачи обработки изображений'
+
+    def __str__(self):
+        return f'{self.source} ({self.attempts})'
@@ -0,0 +1,180 @@
+import base64
+import binascii
+from collections.abc import Sequence
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .caching import POSTS_VERSION, get_version, make_key
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor_parts(*parts):
+    value = '|'.join(str(part) for part in parts)
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+
+def decode_cursor_parts(cursor, count):
+    """Части курсора в виде строк; InvalidCursor, если он повреждён."""
+    try:
+        value = base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)
+        ).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise InvalidCursor(cursor)
+    parts = value.split('|')
+    if len(parts) != count:
+        raise InvalidCursor(cursor)
+    return parts
+
+
+class CursorPage(Sequence):
+    is_cursor_page = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    forward, backward = 'n', 'p'
+
+    def __init__(self, object_list, per_page, key='pub_date',
+                 descending=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.key = key
+        self.descending = descending
+
+    def encode_cursor(self, obj, direction):
+        return encode_cursor_parts(
+            direction, getattr(obj, self.key).isoformat(), obj.pk
+        )
+
+    def decode_cursor(self, cursor):
+        direction, position, pk = decode_cursor_parts(cursor, 3)
+        if direction not in (self.forward, self.backward):
+            raise InvalidCursor(cursor)
+        try:
+            return direction, datetime.fromisoformat(position), int(pk)
+        except ValueError:
+            raise InvalidCursor(cursor)
+
+    def filter_after(self, queryset, position, pk, direction):
+        forward = direction == self.forward
+        lookup = 'lt' if forward == self.descending else 'gt'
+        return queryset.filter(
+            Q(**{f'{self.key}__{lookup}': position})
+            | Q(**{self.key: position, f'pk__{lookup}': pk})
+        )
+
+    def get_page_queryset(self, cursor=None):
+        """Запрос страницы по ключу и направление перехода."""
+        prefix = '-' if self.descending else ''
+        queryset = self.object_list.order_by(
+            f'{prefix}{self.key}', f'{prefix}pk'
+        )
+        direction = self.forward
+        if cursor:
+            direction, position, pk = self.decode_cursor(cursor)
+            queryset = self.filter_after(queryset, position, pk, direction)
+            if direction == self.backward:
+                queryset = queryset.reverse()
+        return queryset[:self.per_page + 1], direction
+
+    def page(self, cursor=None):
+        queryset, direction = self.get_page_queryset(cursor)
+        objects = list(queryset)
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if direction == self.backward:
+            objects.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        return CursorPage(
+            objects,
+            self,
+            next_cursor=(
+                self.encode_cursor(objects[-1], self.forward)
+                if objects and has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(objects[0], self.backward)
+                if objects and has_previous else None
+            ),
+        )
+
+
+class CachedCountPage(Page):
+
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(self.number)
+
+    def next_cursor(self):
+        if self.object_list:
+            return CursorPaginator(self.object_list, 0).encode_cursor(
+                self.object_list[len(self.object_list) - 1],
+                CursorPaginator.forward,
+            )
+
+
+class CachedCountPaginator(Paginator):
+    count_limit = settings.POSTS_COUNT_LIMIT
+    count_timeout = settings.POSTS_COUNT_CACHE_TIMEOUT
+
+    def __init__(self, object_list, per_page, count_key='', **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+
+    def count_objects(self):
+        queryset = self.object_list.order_by()
+        if self.count_limit:
+            queryset = queryset[:self.count_limit]
+        return queryset.count()
+
+    @cached_property
+    def count(self):
+        key = make_key(
+            'post_count', get_version(POSTS_VERSION), self.count_key
+        )
+        count = cache.get(key)
+        if count is None:
+            count = self.count_objects()
+            cache.set(key, count, self.count_timeout)
+        return count
+
+    @property
+    def is_approximate(self):
+        return bool(self.count_limit) and self.count >= self.count_limit
+
+    def _get_page(self, *args, **kwargs):
+        return CachedCountPage(*args, **kwargs)
@@ -0,0 +1,228 @@
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+from django.db.models.constants import LOOKUP_SEP
+
+from .caching import bump_version, get_versions, make_key
+
+WRITE_RE = re.compile(
+    r'^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE|DELETE\s+FROM)'
+    r'\s+["`]?(\w+)',
+    re.IGNORECASE,
+)
+STATS_KEYS = {'hits': 'blog:querycache:hits',
+              'misses': 'blog:querycache:misses'}
+MISSING = object()
+
+
+def table_version(table):
+    return f'table:{table}'
+
+
+class QueryCacheStats:
+    """Счётчики попаданий и промахов в памяти процесса.
+
+    В общий кеш они переносятся не чаще раза в
+    QUERY_CACHE_STATS_FLUSH секунд и перед чтением статистики, чтобы
+    чтение из кеша не оборачивалось записью в общий кеш.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.flushed_at = time.monotonic()
+
+    def record(self, name):
+        with self.lock:
+            self.counts[name] += 1
+            due = (
+                time.monotonic() - self.flushed_at
+                >= settings.QUERY_CACHE_STATS_FLUSH
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+            self.flushed_at = time.monotonic()
+        for name, count in counts.items():
+            try:
+                cache.incr(STATS_KEYS[name], count)
+            except ValueError:
+                if not cache.add(STATS_KEYS[name], count, None):
+                    cache.incr(STATS_KEYS[name], count)
+
+    def reset(self):
+        with self.lock:
+            self.counts.clear()
+        cache.delete_many(STATS_KEYS.values())
+
+
+stats = QueryCacheStats()
+
+
+def record(name):
+    stats.record(name)
+
+
+def get_stats():
+    stats.flush()
+    found = cache.get_many(STATS_KEYS.values())
+    return {name: found.get(key, 0) for name, key in STATS_KEYS.items()}
+
+
+def reset_stats():
+    stats.reset()
+
+
+def invalidate_tables(*tables):
+    bump_version(*(table_version(table) for table in tables))
+
+
+class TableWriteTracker:
+    """Обёртка выполнения SQL, сбрасывающая кеш запросов по таблицам.
+
+    Ловит любые INSERT, UPDATE и DELETE, включая bulk_create, update()
+    и каскадное удаление, которые проходят мимо сигналов моделей.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.dirty = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        # Версия меняется только после записи: иначе запрос, прочитавший
+        # новую версию до записи, закеширует под ней старые строки.
+        match = WRITE_RE.match(sql)
+        if match is not None:
+            self.mark_dirty(match.group(1))
+        return result
+
+    def mark_dirty(self, table):
+        if not self.connection.in_atomic_block:
+            invalidate_tables(table)
+            return
+        # В транзакции запись видна другим только после фиксации.
+        # Обработчик регистрируется заново, если прежний пропал вместе
+        # с откаченной точкой сохранения или ещё не создан на этом уровне.
+        self.dirty.add(table)
+        callbacks = self.connection.run_on_commit
+        if not callbacks or callbacks[-1] != (
+            set(self.connection.savepoint_ids), self.flush
+        ):
+            transaction.on_commit(self.flush, using=self.connection.alias)
+
+    def flush(self):
+        tables, self.dirty = self.dirty, set()
+        if tables:
+            invalidate_tables(*tables)
+
+    def is_clean(self):
+        if not self.connection.in_atomic_block:
+            # Транзакция с записью откатилась: on_commit не сработал.
+            self.dirty.clear()
+        return not self.dirty
+
+
+def install_write_tracker(connection):
+    if not any(
+        isinstance(wrapper, TableWriteTracker)
+        for wrapper in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.append(TableWriteTracker(connection))
+
+
+def get_write_tracker(connection):
+    for wrapper in connection.execute_wrappers:
+        if isinstance(wrapper, TableWriteTracker):
+            return wrapper
+
+
+class CachedQuerySetMixin:
+    _query_cache_timeout = None
+
+    def cached(self, timeout=None):
+        clone = self._chain()
+        clone._query_cache_timeout = (
+            timeout or settings.QUERY_CACHE_TIMEOUT
+        )
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._query_cache_timeout = self._query_cache_timeout
+        return clone
+
+    def get_query_cache_key(self):
+        query = self.query.chain()
+        sql, params = query.get_compiler(using=self.db).as_sql()
+        tables = {join.table_name for join in query.alias_map.values()}
+        for lookup in self._prefetch_related_lookups:
+            name = getattr(lookup, 'prefetch_through', lookup)
+            field = self.model._meta.get_field(name.split(LOOKUP_SEP)[0])
+            tables.add(field.related_model._meta.db_table)
+        tables = sorted(tables)
+        return make_key(
+            'query',
+            *get_versions([table_version(table) for table in tables]),
+            # Результат с отстающей реплики не должен доставаться сессиям,
+            # закреплённым за основной базой.
+            self.db,
+            self.model._meta.label,
+            self._iterable_class.__name__,
+            self._fields,
+            sql,
+            params,
+        )
+
+    def can_use_query_cache(self):
+        if self._query_cache_timeout is None or self._result_cache is not None:
+            return False
+        tracker = get_write_tracker(connections[self.db])
+        return tracker is None or tracker.is_clean()
+
+    def _fetch_all(self):
+        if self.can_use_query_cache():
+            try:
+                key = self.get_query_cache_key()
+            except EmptyResultSet:
+                key = None
+            results = MISSING if key is None else cache.get(key, MISSING)
+            if results is MISSING:
+                super()._fetch_all()
+                if key is not None:
+                    record('misses')
+                    cache.set(key, self._result_cache,
+                              self._query_cache_timeout)
+            else:
+                record('hits')
+                # Связанные объекты закешированы вместе с результатом.
+                self._result_cache = results
+                self._prefetch_done = True
+        super()._fetch_all()
+
+
+CACHED_CLASSES = {}
+
+
+def cached_queryset(queryset, timeout=None):
+    """Включает кеш результатов для queryset любой модели."""
+    queryset_class = type(queryset)
+    if not issubclass(queryset_class, CachedQuerySetMixin):
+        if queryset_class not in CACHED_CLASSES:
+            CACHED_CLASSES[queryset_class] = type(
+                f'Cached{queryset_class.__name__}',
+                (CachedQuerySetMixin, queryset_class),
+                {},
+            )
+        queryset = queryset._chain()
+        queryset.__class__ = CACHED_CLASSES[queryset_class]
+    return queryset.cached(timeout)
@@ -0,0 +1,59 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .caching import CONTENT_VERSION, POSTS_VERSION, bump_version
+from .querycache import invalidate_tables
+
+use_replica = ContextVar('use_replica', default=False)
+
+# Сессия после записи до этого момента читает только основную базу.
+PINNED_SESSION_KEY = '_primary_db_pinned_until'
+
+
+def is_session_pinned(request):
+    return (
+        hasattr(request, 'session')
+        and request.session.get(PINNED_SESSION_KEY, 0) > time.time()
+    )
+
+
+def invalidate_replica_reads():
+    """Сбрасывает кеши, собранные по прежней копии реплик.
+
+    Страницы, счётчики и результаты запросов, прочитанные с отстающей
+    реплики, живут только до её следующей синхронизации.
+    """
+    bump_version(POSTS_VERSION, CONTENT_VERSION)
+    invalidate_tables(*(
+        model._meta.db_table
+        for app_label in ReadReplicaRouter.app_labels
+        for model in apps.get_app_config(app_label).get_models()
+    ))
+
+
+class ReadReplicaRouter:
+    app_labels = {'blog'}
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_READ_REPLICAS
+        if (
+            replicas
+            and use_replica.get()
+            and model._meta.app_label in self.app_labels
+        ):
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_READ_REPLICAS
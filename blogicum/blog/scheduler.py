@@ -0,0 +1,99 @@
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import ScheduledPublication, bucketed_now, quantize_time
+
+logger = logging.getLogger(__name__)
+
+# Отправляется, когда наступает pub_date отложенной публикации.
+post_went_live = Signal()
+
+
+def schedule_post(post):
+    if post.pub_date > bucketed_now():
+        # Лента сравнивает pub_date с началом текущего интервала,
+        # поэтому пост появляется на границе следующего за pub_date.
+        ScheduledPublication.objects.update_or_create(
+            publication=post,
+            defaults={'publish_at': quantize_time(post.pub_date, ceil=True)},
+        )
+        transaction.on_commit(scheduler.wake)
+    else:
+        ScheduledPublication.objects.filter(publication=post).delete()
+
+
+def publish_due(now=None):
+    now = now or timezone.now()
+    due = ScheduledPublication.objects.filter(
+        publish_at__lte=now
+    ).select_related('publication')
+    published = 0
+    for schedule in due:
+        # Событие отправляет только тот процесс, который удалил запись.
+        deleted, _ = ScheduledPublication.objects.filter(
+            pk=schedule.pk
+        ).delete()
+        if deleted:
+            post_went_live.send(
+                sender=schedule.publication.__class__,
+                instance=schedule.publication,
+            )
+            published += 1
+    return published
+
+
+def seconds_until_next(limit):
+    schedule = ScheduledPublication.objects.only('publish_at').first()
+    if schedule is None:
+        return limit
+    delay = (schedule.publish_at - timezone.now()).total_seconds()
+    return min(max(delay, 0), limit)
+
+
+class PublicationScheduler:
+
+    def __init__(self, poll_interval):
+        self.poll_interval = poll_interval
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.pid = None
+
+    def ensure_started(self):
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                threading.Thread(
+                    target=self.run, name='blog-scheduler', daemon=True
+                ).start()
+
+    def wake(self):
+        self.wakeup.set()
+
+    def tick(self):
+        close_old_connections()
+        try:
+            publish_due()
+            return seconds_until_next(self.poll_interval)
+        except DatabaseError:
+            logger.exception('Не удалось обработать отложенные публикации')
+            return self.poll_interval
+        finally:
+            close_old_connections()
+
+    def run(self):
+        while True:
+            self.wakeup.clear()
+            self.wakeup.wait(self.tick())
+
+
+scheduler = PublicationScheduler(
+    poll_interval=settings.PUBLICATION_SCHEDULER_POLL
+)
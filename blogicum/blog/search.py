@@ -0,0 +1,128 @@
+import re
+
+import snowballstemmer
+from django.db import connection
+from django.db.models import BigIntegerField
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+from .paginators import (
+    CursorPage, InvalidCursor, decode_cursor_parts, encode_cursor_parts
+)
+
+SEARCH_TABLE = 'blog_post_search'
+RANK = f'bm25({SEARCH_TABLE})'
+WORD_RE = re.compile(r'\w+')
+
+stemmer = snowballstemmer.stemmer('russian')
+
+
+def is_search_available():
+    return connection.vendor == 'sqlite'
+
+
+def stem_text(text):
+    return ' '.join(stemmer.stemWords(WORD_RE.findall(text.lower())))
+
+
+def build_match_query(query):
+    stems = stem_text(query).split()
+    return ' '.join(f'"{stem}"*' for stem in stems)
+
+
+def index_posts(posts, table=SEARCH_TABLE):
+    rows = [
+        (post.pk, stem_text(post.title), stem_text(post.text))
+        for post in posts
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {table} WHERE rowid = %s',
+            [(row[0],) for row in rows],
+        )
+        cursor.executemany(
+            f'INSERT INTO {table} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            rows,
+        )
+
+
+def remove_posts(pks):
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+            [(pk,) for pk in pks],
+        )
+
+
+def create_index_table(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {table}')
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE {table} USING fts5('
+            "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def remove_missing_posts(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE rowid NOT IN '
+            f'(SELECT id FROM {Post._meta.db_table})'
+        )
+
+
+def replace_index(table):
+    """Подменяет рабочий индекс построенной таблицей table."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE {SEARCH_TABLE}')
+        cursor.execute(f'ALTER TABLE {table} RENAME TO {SEARCH_TABLE}')
+
+
+def encode_cursor(rank, pk):
+    return encode_cursor_parts(repr(rank), pk)
+
+
+def decode_cursor(cursor):
+    rank, pk = decode_cursor_parts(cursor, 2)
+    try:
+        return float(rank), int(pk)
+    except ValueError:
+        raise InvalidCursor(cursor)
+
+
+def search_posts(query, per_page, cursor=None):
+    match = build_match_query(query)
+    if not match:
+        return CursorPage([], None)
+    # Подзапрос связан со строкой индекса через rowid, поэтому
+    # видимость проверяется по первичному ключу только у найденных строк.
+    visible_sql, visible_params = (
+        Post.published.order_by()
+        .filter(pk=RawSQL(f'{SEARCH_TABLE}.rowid', (), BigIntegerField()))
+        .values('pk')
+        .query.sql_with_params()
+    )
+    sql = (
+        f'SELECT rowid, {RANK} AS score FROM {SEARCH_TABLE} '
+        f'WHERE {SEARCH_TABLE} MATCH %s AND EXISTS ({visible_sql})'
+    )
+    params = [match, *visible_params]
+    if cursor:
+        rank, pk = decode_cursor(cursor)
+        sql += f' AND ({RANK} > %s OR ({RANK} = %s AND rowid > %s))'
+        params += [rank, rank, pk]
+    sql += ' ORDER BY score, rowid LIMIT %s'
+    params.append(per_page + 1)
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, params)
+        rows = db_cursor.fetchall()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    posts = Post.published.for_feed().in_bulk([pk for pk, _ in rows])
+    return CursorPage(
+        [posts[pk] for pk, _ in rows if pk in posts],
+        None,
+        next_cursor=encode_cursor(*rows[-1][::-1]) if has_next else None,
+        previous_cursor=None,
+    )
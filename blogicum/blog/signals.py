@@ -0,0 +1,143 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .caching import (
+    CARDS_VERSION,
+    CONTENT_VERSION,
+    POSTS_VERSION,
+    bump_version,
+    bump_version_on_commit,
+)
+from .image_tasks import enqueue_image, image_worker
+from .images import needs_processing, process_post_image
+from .models import Category, Comment, Location, Post
+from .querycache import install_write_tracker
+from .scheduler import post_went_live, schedule_post, scheduler
+from .search import index_posts, is_search_available, remove_posts
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.publication_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(
+        pk=instance.publication_id, comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Category)
+def sync_post_visibility(sender, instance, **kwargs):
+    # Одно UPDATE по индексу категории, затрагивающее только
+    # публикации, у которых флаг видимости действительно меняется.
+    posts = Post.objects.filter(category=instance)
+    if instance.is_published:
+        posts.filter(~Q(is_visible=F('is_published'))).update(
+            is_visible=F('is_published')
+        )
+    else:
+        posts.filter(is_visible=True).update(is_visible=False)
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    Post.objects.filter(category=instance, is_visible=True).update(
+        is_visible=False
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_post_counts(sender, using, **kwargs):
+    bump_version_on_commit(POSTS_VERSION, using=using)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_pages(sender, using, **kwargs):
+    bump_version_on_commit(CONTENT_VERSION, using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_post_cards(sender, using, **kwargs):
+    # Изменения самой публикации и числа комментариев уже входят
+    # в ключ карточки через updated_at и comment_count.
+    bump_version_on_commit(CARDS_VERSION, using=using)
+
+
+@receiver(post_save, sender=Post)
+def update_image_variants(sender, instance, **kwargs):
+    # Копии строятся в фоне, до тех пор шаблоны показывают оригинал.
+    # Удаление изображения обходится без чтения файлов и делается сразу.
+    if not needs_processing(instance):
+        return
+    if instance.image:
+        enqueue_image(instance)
+    else:
+        process_post_image(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_schedule(sender, instance, **kwargs):
+    schedule_post(instance)
+
+
+@receiver(post_went_live)
+def invalidate_on_publication(sender, instance, **kwargs):
+    # Срок публикации наступил: пост появился в ленте, категории
+    # и профиле автора, поэтому сбрасываем счётчики и страницы.
+    bump_version(POSTS_VERSION, CONTENT_VERSION)
+
+
+@receiver(request_started)
+def start_background_threads(sender, **kwargs):
+    if settings.PUBLICATION_SCHEDULER:
+        scheduler.ensure_started()
+    if settings.IMAGE_WORKERS:
+        image_worker.ensure_started()
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, **kwargs):
+    if is_search_available():
+        index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    if is_search_available():
+        remove_posts([instance.pk])
+
+
+@receiver(connection_created)
+def track_table_writes(sender, connection, **kwargs):
+    install_write_tracker(connection)
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,157 @@
+import hashlib
+import posixpath
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import FileField
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: блокировка первого байта файла через msvcrt.
+    fcntl = None
+    import msvcrt
+
+# 160 бит хватает, чтобы не опасаться совпадений, и путь с несколькими
+# уровнями каталогов укладывается в 100 символов поля модели.
+DIGEST_SIZE = 20
+# Служебные каталоги внутри MEDIA_ROOT: файлы блокировок и отметки
+# о повторном использовании файлов.
+LOCKS_DIR = '.locks'
+CLAIMS_DIR = '.claims'
+
+
+def lock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        return
+    file.seek(0)
+    while True:
+        try:
+            # LK_LOCK сам повторяет попытки около 10 секунд.
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def unlock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file, fcntl.LOCK_UN)
+        return
+    file.seek(0)
+    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файлы под именами из хеша содержимого.
+
+    Одинаковые загрузки записываются один раз в каталог upload_to/ab/cd/,
+    число и длина уровней задаются MEDIA_SHARD_LEVELS и MEDIA_SHARD_WIDTH.
+    Ссылки на файл считаются по всем полям моделей с этим хранилищем,
+    и django_cleanup удаляет файл только вместе с последней из них.
+    """
+
+    def get_shards(self, digest):
+        width = settings.MEDIA_SHARD_WIDTH
+        return [
+            digest[level * width:(level + 1) * width]
+            for level in range(settings.MEDIA_SHARD_LEVELS)
+        ]
+
+    def get_content_name(self, name, content):
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        directory, filename = posixpath.split(name)
+        suffix = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(
+            directory, *self.get_shards(digest), digest + suffix
+        )
+
+    def get_layout_regex(self, directory):
+        """Регулярное выражение для имён в текущей раскладке каталога."""
+        shard = f'[0-9a-f]{{{settings.MEDIA_SHARD_WIDTH}}}/'
+        return (
+            f'^{re.escape(directory)}/{shard * settings.MEDIA_SHARD_LEVELS}'
+            f'[0-9a-f]{{{DIGEST_SIZE * 2}}}(\\.[a-z0-9]+)?$'
+        )
+
+    @contextmanager
+    def lock(self, name):
+        # 256 файлов блокировок на всё хранилище, общих для процессов.
+        stripe = hashlib.blake2b(name.encode(), digest_size=1).hexdigest()
+        path = Path(self.location) / LOCKS_DIR / f'{stripe}.lock'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a') as file:
+            lock_file(file)
+            try:
+                yield
+            finally:
+                unlock_file(file)
+
+    def get_claim_path(self, name):
+        return Path(self.location) / CLAIMS_DIR / name
+
+    def claim(self, name):
+        path = self.get_claim_path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    def is_claimed(self, name):
+        """Файл недавно отдан новой загрузке, чья строка ещё не видна."""
+        path = self.get_claim_path(name)
+        try:
+            age = time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        if age < settings.MEDIA_CLAIM_TIMEOUT:
+            return True
+        path.unlink(missing_ok=True)
+        return False
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.get_content_name(name, content)
+        with self.lock(name):
+            if not self.exists(name):
+                return super().save(name, content, max_length)
+            # Ссылка появится только после фиксации транзакции загрузки,
+            # до тех пор отметка не даёт delete() удалить файл.
+            self.claim(name)
+            return name
+
+    def get_file_fields(self):
+        for model in apps.get_models():
+            for field in model._meta.get_fields():
+                if isinstance(field, FileField) and field.storage is self:
+                    yield model, field
+
+    def count_references(self, name):
+        return sum(
+            model._base_manager.using(DEFAULT_DB_ALIAS)
+            .filter(**{field.name: name})
+            .count()
+            for model, field in self.get_file_fields()
+        )
+
+    def delete(self, name):
+        # django_cleanup вызывает delete после фиксации транзакции,
+        # когда строка с прежним файлом уже изменена или удалена.
+        with self.lock(name):
+            if not self.count_references(name) and not self.is_claimed(name):
+                super().delete(name)
+
+
+content_storage = ContentAddressedStorage()
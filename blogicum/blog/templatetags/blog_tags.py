@@ -0,0 +1,83 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.base import token_kwargs
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.caching import CARDS_VERSION, get_version, make_key
+from blog.forms import CommentForm
+from blog.holes import make_placeholder, render_hole
+
+register = template.Library()
+
+
+class HoleNode(template.Node):
+
+    def __init__(self, template_name, values):
+        self.template_name = template_name
+        self.values = values
+
+    def render(self, context):
+        template_name = self.template_name.resolve(context)
+        values = {
+            name: value.resolve(context)
+            for name, value in self.values.items()
+        }
+        if context.get('punch_holes'):
+            return make_placeholder(template_name, values)
+        return render_hole(template_name, values, context.get('request'))
+
+
+@register.tag
+def hole(parser, token):
+    """Персональный фрагмент страницы.
+
+    На кешируемых страницах вместо фрагмента выводится метка, которую
+    HolePunchMiddleware заполняет для текущего пользователя:
+    {% hole "includes/post_controls.html" post_id=post.id %}
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} ожидает имя шаблона фрагмента'
+        )
+    values = token_kwargs(bits[2:], parser)
+    if len(values) != len(bits) - 2:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает только именованные аргументы'
+        )
+    return HoleNode(parser.compile_filter(bits[1]), values)
+
+
+@register.simple_tag
+def comment_form():
+    return CommentForm()
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Карточки публикаций страницы с кешированием каждой карточки.
+
+    Все карточки читаются одним get_many, шаблон рендерится только
+    для промахов: {% post_cards page_obj as cards %}
+    """
+    version = get_version(CARDS_VERSION)
+    keys = {
+        post.pk: make_key(
+            'post_card', version, post.pk,
+            post.updated_at.timestamp(), post.comment_count,
+        )
+        for post in posts
+    }
+    cards = cache.get_many(keys.values())
+    missing = {}
+    for post in posts:
+        if keys[post.pk] not in cards:
+            missing[keys[post.pk]] = render_to_string(
+                'includes/post_card.html', {'post': post}
+            )
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    return [mark_safe(cards[keys[post.pk]]) for post in posts]
@@ -6,6 +6,7 @@ app_name = 'blog'
 
 urlpatterns = [
     path('', views.PostListView.as_view(), name='index'),
+    path('search/', views.PostSearchView.as_view(), name='search'),
     path('posts/<int:pk>/',
          views.PostDetailView.as_view(), name='post_detail'),
     path('posts/create/',
@@ -20,6 +21,8 @@ urlpatterns = [
          views.ProfileUpdateView.as_view(), name='edit_profile'),
     path('profile/<slug:slug>/',
          views.PostsUserView.as_view(), name='profile'),
+    path('posts/<int:post_id>/comments/',
+         views.PostCommentsView.as_view(), name='comments'),
     path('posts/<int:post_id>/comment/',
          views.CommentCreateView.as_view(), name='add_comment'),
     path('posts/<int:post_id>/comment/<int:comment_id>',
@@ -1,15 +1,117 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.http import Http404
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 from django.views.generic.detail import SingleObjectMixin
 
+from .caching import CONTENT_VERSION, get_version, make_key, single_flight
 from .forms import CommentForm
-from .models import Comment, Post
+from .models import Comment, Post, bucketed_now
+from .paginators import CachedCountPaginator, CursorPaginator, InvalidCursor
+from .querycache import cached_queryset
+from .routers import is_session_pinned
+from .writer import WriteQueueFull, write_queue
 
 
-class BaseClassComment(LoginRequiredMixin):
+class SerializedWriteMixin:
+    """Передаёт потоку-писателю только запись в базу.
+
+    Проверка формы и отрисовка ответа остаются в потоке запроса, чтобы
+    транзакция пакета записей не ждала шаблонов.
+    """
+
+    def serialize_write(self, func, *args, **kwargs):
+        if not settings.SERIALIZE_WRITES:
+            return func(*args, **kwargs)
+        try:
+            return write_queue.submit(func, *args, **kwargs)
+        except WriteQueueFull:
+            response = HttpResponse('Сервер перегружен, повторите запрос.',
+                                    status=503)
+            response['Retry-After'] = 1
+            return response
+
+    def form_valid(self, form):
+        return self.serialize_write(super().form_valid, form)
+
+    def delete(self, request, *args, **kwargs):
+        return self.serialize_write(super().delete, request, *args, **kwargs)
+
+
+class PageCacheMixin:
+    """Кеширует общую для всех пользователей версию страницы.
+
+    Персональные фрагменты выводятся тегом {% hole %} как метки и
+    заполняются для каждого запроса в HolePunchMiddleware.
+    """
+
+    page_cache_timeout = settings.PAGE_CACHE_TIMEOUT
+    use_page_cache = False
+
+    def is_page_cacheable(self):
+        return True
+
+    def get_page_cache_path(self):
+        return self.request.path
+
+    def get_page_cache_parts(self):
+        return (
+            self.get_page_cache_path(),
+            self.request.GET.get('page', ''),
+            self.request.GET.get('cursor', ''),
+        )
+
+    def get_page_cache_key(self):
+        return make_key(
+            'page',
+            get_version(CONTENT_VERSION),
+            *self.get_page_cache_parts(),
+        )
+
+    def get_page_stale_key(self):
+        return make_key('page-stale', *self.get_page_cache_parts())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['punch_holes'] = self.use_page_cache
+        return context
+
+    def dispatch(self, request, *args, **kwargs):
+        # Сессия, закреплённая за основной базой после записи, должна
+        # видеть свои изменения, а не страницу, собранную с реплики.
+        self.use_page_cache = (
+            request.method in ('GET', 'HEAD')
+            and not is_session_pinned(request)
+            and self.is_page_cacheable()
+        )
+        if not self.use_page_cache:
+            return super().dispatch(request, *args, **kwargs)
+        response = None
+
+        def render_page():
+            nonlocal response
+            response = super(PageCacheMixin, self).dispatch(
+                request, *args, **kwargs
+            )
+            if hasattr(response, 'render'):
+                response.render()
+            if response.status_code == 200:
+                return response.content, response['Content-Type']
+
+        cached = single_flight(
+            self.get_page_cache_key(),
+            render_page,
+            self.page_cache_timeout,
+            stale_key=self.get_page_stale_key(),
+        )
+        if response is None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+        response.has_holes = True
+        return response
+
+
+class BaseClassComment(LoginRequiredMixin, SerializedWriteMixin):
     publication = None
     model = Comment
     form_class = CommentForm
@@ -25,34 +127,99 @@ class BaseClassComment(LoginRequiredMixin):
         return super().form_valid(form)
 
 
-class AddPostsUserAndCategoryView(SingleObjectMixin):
+def get_comments_paginator(post):
+    return CursorPaginator(
+        cached_queryset(post.comments.select_related('author')),
+        settings.COMMENTS_PER_PAGE,
+        key='created_at',
+        descending=False,
+    )
+
+
+def paginate_comments(post, cursor=None):
+    try:
+        return get_comments_paginator(post).page(cursor)
+    except InvalidCursor:
+        raise Http404('Неверный курсор страницы')
+
+
+class PostPaginationMixin:
+    paginator_class = CachedCountPaginator
+    cursor_kwarg = 'cursor'
+    cursor_pagination = settings.POSTS_CURSOR_PAGINATION
+
+    def get_count_key(self):
+        return self.request.path
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, count_key=self.get_count_key(), **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if cursor is None and not self.cursor_pagination:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AddPostsUserAndCategoryView(PostPaginationMixin, SingleObjectMixin):
     paginate_by = settings.POSTS_PER_PAGE
 
+    def get_count_key(self):
+        if self.object == self.request.user:
+            return f'{self.request.path}:author'
+        return self.request.path
+
     def get_queryset(self):
         if self.object == self.request.user:
-            return self.object.posts.comment_count().order_by('-pub_date')
+            return (
+                self.object.posts.with_related_data()
+                .for_feed()
+                .order_by('-pub_date')
+                .cached()
+            )
         return self.object.posts(
             manager='published'
-        ).all().order_by('-pub_date')
+        ).for_feed().order_by('-pub_date').cached()
+
 
+class MemoizedObjectMixin:
+    _object = None
 
-class OnlyAuthorMixin(UserPassesTestMixin):
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if self._object is None:
+            self._object = super().get_object()
+        return self._object
+
+
+class OnlyAuthorMixin(MemoizedObjectMixin, UserPassesTestMixin):
 
     def test_func(self):
         object = self.get_object()
-        return object.author == self.request.user
+        return object.author_id == self.request.user.pk
+
+
+def is_public_post(post):
+    return (
+        post.pub_date <= bucketed_now()
+        and post.is_visible
+    )
 
 
-class PermissionUnpublishedMixin(UserPassesTestMixin):
+class PermissionUnpublishedMixin(MemoizedObjectMixin, UserPassesTestMixin):
 
     def test_func(self):
         object = self.get_object()
-        if (
-            object.pub_date >= timezone.now()
-            or not object.is_published
-            or not object.category.is_published
-        ):
-            return object.author == self.request.user
+        if not is_public_post(object):
+            return object.author_id == self.request.user.pk
         else:
             return True
 
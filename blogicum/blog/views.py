@@ -1,25 +1,38 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404, redirect
+from django.http import Http404, JsonResponse
+from django.shortcuts import redirect
+from django.template.loader import render_to_string
 from django.urls import reverse_lazy, reverse
 from django.views.generic import (
-    CreateView, DeleteView, DetailView, ListView, UpdateView
+    CreateView, DeleteView, DetailView, ListView, TemplateView, UpdateView
 )
 
 from .forms import CommentForm, PostForm, UserForm
 from .models import Category, Comment, Post, User
+from .paginators import InvalidCursor
+from .querycache import cached_queryset
+from .search import search_posts
 from .utils import (
-    BaseClassComment, AddPostsUserAndCategoryView,
-    OnlyAuthorMixin, PermissionUnpublishedMixin
+    BaseClassComment, AddPostsUserAndCategoryView, PageCacheMixin,
+    PostPaginationMixin, OnlyAuthorMixin, PermissionUnpublishedMixin,
+    SerializedWriteMixin, is_public_post, paginate_comments
 )
 
 
-class PostsUserView(AddPostsUserAndCategoryView, ListView):
+class PostsUserView(PageCacheMixin, AddPostsUserAndCategoryView, ListView):
     template_name = 'blog/profile.html'
     slug_field = 'username'
 
+    def get_page_cache_path(self):
+        if self.request.user.username == self.kwargs['slug']:
+            return f'{self.request.path}:author'
+        return self.request.path
+
     def get(self, request, *args, **kwargs):
-        self.object = self.get_object(queryset=User.objects.all())
+        self.object = self.get_object(
+            queryset=cached_queryset(User.objects.all())
+        )
         return super().get(request, *args, **kwargs)
 
     def get_context_data(self, **kwargs):
@@ -41,15 +54,18 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class PostListView(ListView):
+class PostListView(PageCacheMixin, PostPaginationMixin, ListView):
     model = Post
     queryset = Post.published
     template_name = 'blog/index.html'
     ordering = '-pub_date'
     paginate_by = settings.POSTS_PER_PAGE
 
+    def get_queryset(self):
+        return super().get_queryset().for_feed().cached()
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+
+class PostCreateView(LoginRequiredMixin, SerializedWriteMixin, CreateView):
     form_class = PostForm
     template_name = 'blog/create.html'
 
@@ -63,7 +79,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostUpdateView(OnlyAuthorMixin, UpdateView):
+class PostUpdateView(OnlyAuthorMixin, SerializedWriteMixin, UpdateView):
     queryset = Post.objects.with_related_data()
     form_class = PostForm
     template_name = 'blog/create.html'
@@ -72,7 +88,7 @@ class PostUpdateView(OnlyAuthorMixin, UpdateView):
         return redirect('blog:post_detail', pk=self.kwargs['pk'])
 
 
-class PostDeleteView(OnlyAuthorMixin, DeleteView):
+class PostDeleteView(OnlyAuthorMixin, SerializedWriteMixin, DeleteView):
     queryset = Post.objects.with_related_data()
     form_class = PostForm
     template_name = 'blog/create.html'
@@ -80,26 +96,51 @@ class PostDeleteView(OnlyAuthorMixin, DeleteView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        instance = get_object_or_404(Post, pk=self.kwargs['pk'])
-        context['form'] = PostForm(instance=instance)
+        context['form'] = PostForm(instance=self.object)
         return context
 
     def form_valid(self, form):
         return super().form_valid(form)
 
 
-class PostDetailView(PermissionUnpublishedMixin, DetailView):
-    queryset = Post.objects.with_related_data()
+class PostDetailView(PermissionUnpublishedMixin, PageCacheMixin, DetailView):
+    queryset = Post.objects.with_related_data().prefetch_related(
+        'image_variants'
+    )
     template_name = 'blog/detail.html'
 
+    def is_page_cacheable(self):
+        return is_public_post(self.get_object())
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related('author')
+        context['comments'] = paginate_comments(self.object)
+        return context
+
+
+class PostCommentsView(PermissionUnpublishedMixin, DetailView):
+    queryset = Post.objects.with_related_data()
+    pk_url_kwarg = 'post_id'
+    template_name = 'includes/comment_list.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = paginate_comments(
+            self.object, self.request.GET.get('cursor')
         )
         return context
 
+    def render_to_response(self, context, **response_kwargs):
+        if 'application/json' not in self.request.headers.get('Accept', ''):
+            return super().render_to_response(context, **response_kwargs)
+        return JsonResponse({
+            'html': render_to_string(
+                self.template_name, context, request=self.request
+            ),
+            'next_cursor': context['comments'].next_cursor,
+        })
+
 
 class CommentCreateView(BaseClassComment, CreateView):
     pass
@@ -109,7 +150,7 @@ class CommentUpdateView(BaseClassComment, OnlyAuthorMixin, UpdateView):
     pk_url_kwarg = 'comment_id'
 
 
-class CommentDeleteView(OnlyAuthorMixin, DeleteView):
+class CommentDeleteView(OnlyAuthorMixin, SerializedWriteMixin, DeleteView):
     model = Comment
     pk_url_kwarg = 'comment_id'
     template_name = 'blog/comment.html'
@@ -121,12 +162,16 @@ class CommentDeleteView(OnlyAuthorMixin, DeleteView):
         )
 
 
-class PostsCategoryView(AddPostsUserAndCategoryView, ListView):
+class PostsCategoryView(
+    PageCacheMixin, AddPostsUserAndCategoryView, ListView
+):
     template_name = 'blog/category.html'
 
     def get(self, request, *args, **kwargs):
         self.object = self.get_object(
-            queryset=Category.objects.filter(is_published=True)
+            queryset=cached_queryset(
+                Category.objects.filter(is_published=True)
+            )
         )
         return super().get(request, *args, **kwargs)
 
@@ -134,3 +179,21 @@ class PostsCategoryView(AddPostsUserAndCategoryView, ListView):
         context = super().get_context_data(**kwargs)
         context['category'] = self.object
         return context
+
+
+class PostSearchView(TemplateView):
+    template_name = 'blog/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        try:
+            context['page_obj'] = search_posts(
+                query,
+                settings.POSTS_PER_PAGE,
+                self.request.GET.get('cursor'),
+            )
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы')
+        context['query'] = query
+        return context
@@ -0,0 +1,116 @@
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+
+class WriteQueueFull(Exception):
+    pass
+
+
+class WriteJob:
+
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+        self.state = 'pending'
+
+    def start(self):
+        with self.lock:
+            if self.state != 'pending':
+                return False
+            self.state = 'running'
+            return True
+
+    def cancel(self):
+        with self.lock:
+            if self.state == 'pending':
+                self.state = 'cancelled'
+
+    def run(self):
+        if not self.start():
+            # Запрос перестал ждать: запись не выполняется.
+            return
+        try:
+            with transaction.atomic():
+                self.result = self.func(*self.args, **self.kwargs)
+        except Exception as error:
+            self.error = error
+
+
+class WriteQueue:
+
+    def __init__(self, maxsize, batch_size, put_timeout, wait_timeout):
+        self.batch_size = batch_size
+        self.put_timeout = put_timeout
+        self.wait_timeout = wait_timeout
+        self.queue = queue.Queue(maxsize)
+        self.lock = threading.Lock()
+        self.pid = None
+        self.thread = None
+
+    def ensure_started(self):
+        # После fork() рабочего процесса поток-писатель нужно
+        # запустить заново, поэтому запоминаем pid.
+        with self.lock:
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.thread = threading.Thread(
+                    target=self.run, name='blog-writer', daemon=True
+                )
+                self.thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        if threading.current_thread() is self.thread:
+            return func(*args, **kwargs)
+        self.ensure_started()
+        job = WriteJob(func, args, kwargs)
+        try:
+            self.queue.put(job, timeout=self.put_timeout)
+        except queue.Full:
+            raise WriteQueueFull()
+        if not job.done.wait(self.wait_timeout):
+            # Поток-писатель завис или погиб: не держим запрос вечно.
+            job.cancel()
+            raise WriteQueueFull()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def next_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            close_old_connections()
+            try:
+                with transaction.atomic():
+                    for job in batch:
+                        job.run()
+            except Exception as error:
+                for job in batch:
+                    job.error = job.error or error
+            for job in batch:
+                job.done.set()
+
+
+write_queue = WriteQueue(
+    maxsize=settings.WRITE_QUEUE_SIZE,
+    batch_size=settings.WRITE_QUEUE_BATCH_SIZE,
+    put_timeout=settings.WRITE_QUEUE_TIMEOUT,
+    wait_timeout=settings.WRITE_QUEUE_WAIT,
+)
@@ -1,3 +1,4 @@
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -34,6 +35,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.ReplicaRoutingMiddleware',
+    'blog.middleware.HolePunchMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -61,6 +64,27 @@ TEMPLATES = [
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
+# Cache: LRU в памяти процесса перед общим для всех рабочих процессов
+# кешем в SQLite с атомарными add() и incr(). Версии и счётчики читаются
+# только из общего кеша.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'blog.cache_backends.TwoTierCache',
+        'OPTIONS': {
+            'SHARED_ALIAS': 'shared',
+            'MAX_BYTES': 32 * 1024 * 1024,
+            'LOCAL_TIMEOUT': 60,
+            'SHARED_ONLY_PREFIXES': ('blog:version:', 'blog:querycache:'),
+        },
+    },
+    'shared': {
+        'BACKEND': 'blog.cache_backends.SQLiteCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'blogicum_cache.sqlite3',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
@@ -68,9 +92,45 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'CONN_MAX_AGE': 600,
+    },
+}
+
+# Параметры соединений SQLite, применяются при каждом подключении:
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
 }
 
+# Реплики только для чтения: псевдонимы из DATABASES, например
+# 'replica_1': {'ENGINE': ..., 'NAME': BASE_DIR / 'db_replica_1.sqlite3'}.
+# Копии обновляются командой sync_read_replicas.
+DATABASE_READ_REPLICAS = []
+
+DATABASE_ROUTERS = ['blog.routers.ReadReplicaRouter']
+
+# Последовательная запись через один поток-писатель на процесс:
+SERIALIZE_WRITES = False
+WRITE_QUEUE_SIZE = 100
+WRITE_QUEUE_BATCH_SIZE = 20
+WRITE_QUEUE_TIMEOUT = 5
+# Сколько секунд запрос ждёт выполнения своей записи, прежде чем ответить 503:
+WRITE_QUEUE_WAIT = 30
+
+# Сколько секунд после записи читать данные пользователя с основной базы:
+READ_YOUR_WRITES_SECONDS = 10
+
+# Поток, публикующий отложенные посты точно в срок (или команда
+# publish_scheduled по расписанию), и максимальная пауза между проверками:
+PUBLICATION_SCHEDULER = True
+PUBLICATION_SCHEDULER_POLL = 60
+# Шаг округления «текущего времени» в запросах опубликованных постов, секунд:
+PUBLISHED_NOW_QUANTUM = 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -122,6 +182,49 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MAX_FIELD_LENGTH = 256
 REPRESENTATION_LENGH = 20
 POSTS_PER_PAGE = 10
+# Длина отрывка публикации в карточках лент, слов:
+EXCERPT_WORDS = 10
+# Постраничный вывод по курсору (?cursor=) вместо номеров страниц:
+POSTS_CURSOR_PAGINATION = False
+# Кеширование и ограничение подсчёта публикаций для пагинатора:
+POSTS_COUNT_CACHE_TIMEOUT = 60 * 10
+POSTS_COUNT_LIMIT = 10000
+COMMENTS_PER_PAGE = 20
+# Кеш страниц (общая для всех пользователей часть), секунд:
+PAGE_CACHE_TIMEOUT = 60 * 10
+# Кеш карточек публикаций в лентах, секунд:
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+# Кеш результатов запросов, помеченных .cached(), секунд:
+QUERY_CACHE_TIMEOUT = 60 * 10
+# Как часто переносить счётчики попаданий кеша запросов в общий кеш, секунд:
+QUERY_CACHE_STATS_FLUSH = 60
+# Ширины уменьшенных копий изображений публикаций, пикселей:
+POST_IMAGE_WIDTHS = (320, 640, 1280)
+# Раскладка изображений по каталогам из начала хеша содержимого:
+# число уровней и символов в имени каталога. После изменения перенесите
+# файлы командой shard_media.
+MEDIA_SHARD_LEVELS = 2
+MEDIA_SHARD_WIDTH = 2
+# Сколько секунд повторно загруженный файл защищён от удаления, пока
+# транзакция новой ссылки на него не зафиксирована:
+MEDIA_CLAIM_TIMEOUT = 10 * 60
+# Строить WebP-версии изображений для браузеров, которые их понимают:
+POST_IMAGE_WEBP = True
+# Фоновая обработка изображений: потоки на процесс (0 — только командой
+# process_image_tasks), пауза опроса очереди, срок аренды задачи
+# и повторы с удвоением задержки, секунд:
+IMAGE_WORKERS = 2
+IMAGE_WORKER_POLL = 5
+IMAGE_TASK_LEASE = 5 * 60
+IMAGE_TASK_MAX_ATTEMPTS = 5
+IMAGE_TASK_RETRY_DELAY = 30
+# Защита от одновременного пересчёта кеша страниц: блокировка пересчёта,
+# ожидание без устаревшей копии и срок хранения устаревшей копии, секунд,
+# а также коэффициент вероятностного досрочного обновления:
+CACHE_LOCK_TIMEOUT = 10
+CACHE_LOCK_WAIT = 0.5
+CACHE_STALE_TIMEOUT = 60 * 60
+CACHE_EARLY_EXPIRY_BETA = 1.0
 LOGIN_REDIRECT_URL = 'blog:index'
 LOGIN_URL = 'login'
 MEDIA_ROOT = BASE_DIR / 'media'
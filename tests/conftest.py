@@ -2,6 +2,7 @@ import os
 import re
 import time
 from http import HTTPStatus
+from io import BytesIO
 from inspect import getsource
 from pathlib import Path
 from typing import (
@@ -19,12 +20,14 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
 from django.test import override_settings
 from django.test.client import Client
 from mixer.backend.django import mixer as _mixer
+from PIL import Image
 
 N_PER_FIXTURE = 3
 N_PER_PAGE = 10
@@ -41,6 +44,32 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def disable_background_threads():
+    with override_settings(PUBLICATION_SCHEDULER=False, IMAGE_WORKERS=0):
+        yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_cache(tmp_path_factory):
+    # clear_cache не должен очищать кеш запущенного рядом сервера.
+    from django.conf import settings
+    caches = {alias: dict(config) for alias, config in settings.CACHES.items()}
+    caches["shared"]["LOCATION"] = (
+        tmp_path_factory.mktemp("cache") / "cache.sqlite3"
+    )
+    with override_settings(CACHES=caches):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -96,6 +125,18 @@ pytest_plugins = [
 ]
 
 
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def make_jpeg(width=800, height=600):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "skyblue").save(buffer, "JPEG")
+    return SimpleUploadedFile("photo.jpg", buffer.getvalue(), "image/jpeg")
+
+
 @pytest.fixture
 def mixer():
     return _mixer
@@ -0,0 +1,37 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", publication=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что при создании комментария увеличивается "
+        "счётчик `comment_count` публикации."
+    )
+
+    comments[0].delete()
+    post.save()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик, "
+        "а сохранение публикации не перезаписывает его."
+    )
+
+
+def test_recount_comments(mixer, post_with_published_location):
+    mixer.cycle(2).blend(
+        "blog.Comment", publication=post_with_published_location
+    )
+    Post.objects.update(comment_count=0)
+    call_command("recount_comments", batch_size=1)
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.comment_count == 2, (
+        "Убедитесь, что команда `recount_comments` пересчитывает "
+        "количество комментариев."
+    )
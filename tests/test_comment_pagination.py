@@ -0,0 +1,33 @@
+import pytest
+from django.test.utils import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(COMMENTS_PER_PAGE=3)
+def test_comments_load_more(
+        user_client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(5).blend("blog.Comment", publication=post)
+    response = user_client.get(f"/posts/{post.id}/")
+    page = response.context["comments"]
+    assert list(page) == comments[:3], (
+        "Убедитесь, что на странице публикации сразу выводится только "
+        "первая порция комментариев."
+    )
+    assert page.has_next()
+
+    response = user_client.get(
+        f"/posts/{post.id}/comments/?cursor={page.next_cursor}"
+    )
+    assert list(response.context["comments"]) == comments[3:]
+    assert f'name="comment_{comments[4].id}"' in response.content.decode()
+
+    response = user_client.get(
+        f"/posts/{post.id}/comments/?cursor={page.next_cursor}",
+        HTTP_ACCEPT="application/json",
+    )
+    data = response.json()
+    assert f'name="comment_{comments[3].id}"' in data["html"]
+    assert data["next_cursor"] is None
@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from blog.models import Post
+from conftest import make_jpeg
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def image_settings(media_root, settings):
+    settings.POST_IMAGE_WIDTHS = ()
+    settings.POST_IMAGE_WEBP = False
+
+
+@pytest.fixture
+def two_posts(mixer, user, published_category):
+    return mixer.cycle(2).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image=make_jpeg(),
+    )
+
+
+def test_identical_uploads_stored_once(two_posts):
+    first, second = two_posts
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые изображения сохраняются в один файл."
+    )
+    parts = first.image.name.split("/")
+    assert parts[0] == "post_photo" and len(parts[1]) == len(parts[2]) == 2
+    assert first.image.storage.exists(first.image.name)
+
+
+def test_file_removed_with_last_reference(
+    two_posts, settings, django_capture_on_commit_callbacks
+):
+    settings.MEDIA_CLAIM_TIMEOUT = 0
+    first, second = two_posts
+    name = first.image.name
+    storage = first.image.storage
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert storage.exists(name), (
+        "Убедитесь, что файл, на который ссылается другая публикация, "
+        "не удаляется."
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        Post.objects.get(pk=second.pk).delete()
+    assert not storage.exists(name), (
+        "Убедитесь, что файл удаляется вместе с последней ссылкой на него."
+    )
+
+
+def test_replacing_image_keeps_shared_file(
+    two_posts, django_capture_on_commit_callbacks
+):
+    first, second = two_posts
+    name = first.image.name
+    first = Post.objects.get(pk=first.pk)
+    first.image = make_jpeg(width=400)
+    with django_capture_on_commit_callbacks(execute=True):
+        first.save()
+    assert first.image.name != name
+    assert first.image.storage.exists(name)
+
+
+def test_reused_file_survives_concurrent_delete(
+    two_posts, django_capture_on_commit_callbacks
+):
+    first, second = two_posts
+    name = first.image.name
+    storage = first.image.storage
+    Post.objects.filter(pk=second.pk).update(image="")
+    # Загрузка тех же байт, строка которой ещё не зафиксирована.
+    assert storage.save("post_photo/again.jpg", make_jpeg()) == name
+    with django_capture_on_commit_callbacks(execute=True):
+        Post.objects.get(pk=first.pk).delete()
+    assert storage.exists(name), (
+        "Убедитесь, что файл, только что повторно отданный новой загрузке, "
+        "не удаляется вместе с последней зафиксированной ссылкой."
+    )
+
+
+def test_missing_file_rewritten_on_save(two_posts):
+    first, _ = two_posts
+    storage = first.image.storage
+    os.remove(storage.path(first.image.name))
+    assert storage.save("post_photo/again.jpg", make_jpeg()) == (
+        first.image.name
+    )
+    assert storage.exists(first.image.name), (
+        "Убедитесь, что удалённый файл записывается заново при загрузке "
+        "тех же байт."
+    )
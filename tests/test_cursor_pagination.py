@@ -0,0 +1,38 @@
+import re
+
+import pytest
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_cursor_pagination(user_client, many_posts_with_published_locations):
+    posts = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.pk),
+        reverse=True,
+    )
+    seen = []
+    url = "/?cursor="
+    while url:
+        response = user_client.get(url)
+        page_obj = response.context["page_obj"]
+        seen.extend(page_obj)
+        assert len(page_obj) <= N_PER_PAGE
+        next_link = re.search(
+            r'href="(\?cursor=[\w-]+)"[^>]*>\s*>>',
+            response.content.decode("utf-8"),
+        )
+        url = "/" + next_link.group(1) if next_link else None
+    assert seen == posts, (
+        "Убедитесь, что при переходе по курсорам публикации выводятся "
+        "без пропусков и повторов, «от новых к старым»."
+    )
+
+    response = user_client.get(f"/?cursor={page_obj.previous_cursor}")
+    assert list(response.context["page_obj"]) == posts[:N_PER_PAGE]
+
+
+def test_invalid_cursor_returns_404(user_client):
+    assert user_client.get("/?cursor=not-a-cursor").status_code == 404
@@ -0,0 +1,58 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = " ".join(f"слово{number}" for number in range(500))
+
+
+def test_excerpt_maintained_on_save(post_with_published_location):
+    post = post_with_published_location
+    post.text = LONG_TEXT
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == " ".join(LONG_TEXT.split()[:10]) + " …", (
+        "Убедитесь, что при сохранении публикации обновляется её отрывок."
+    )
+
+
+def test_feed_does_not_load_post_text(client, post_with_published_location):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get("/")
+    feed_queries = [
+        query["sql"] for query in context.captured_queries
+        if 'FROM "blog_post"' in query["sql"]
+        and "COUNT" not in query["sql"]
+    ]
+    assert feed_queries
+    assert all('"blog_post"."text"' not in sql for sql in feed_queries), (
+        "Убедитесь, что лента не загружает полный текст публикаций."
+    )
+    assert post_with_published_location.excerpt in response.content.decode()
+
+
+def test_backfill_excerpts(post_with_published_location):
+    Post.objects.update(text=LONG_TEXT, excerpt="")
+    call_command("backfill_excerpts", batch_size=1)
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    assert post.excerpt.startswith("слово0 слово1"), (
+        "Убедитесь, что команда backfill_excerpts заполняет отрывки."
+    )
+
+
+def test_backfill_invalidates_cards(client, settings,
+                                    post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(text=LONG_TEXT)
+    client.get("/")
+    settings.EXCERPT_WORDS = 3
+    call_command("backfill_excerpts")
+    content = client.get("/").content.decode()
+    assert "слово0 слово1 слово2 …" in content, (
+        "Убедитесь, что после backfill_excerpts лента показывает новые "
+        "отрывки, а не закешированные карточки."
+    )
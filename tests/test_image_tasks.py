@@ -0,0 +1,70 @@
+import os
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.image_tasks import run_pending
+from blog.models import ImageTask, Post
+from conftest import make_jpeg
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def image_settings(media_root, settings):
+    settings.POST_IMAGE_WIDTHS = (320, 640)
+    settings.IMAGE_TASK_RETRY_DELAY = 30
+    settings.IMAGE_TASK_MAX_ATTEMPTS = 2
+
+
+def test_upload_enqueues_task(post_with_published_location):
+    post = post_with_published_location
+    post.image = make_jpeg()
+    post.save()
+    assert ImageTask.objects.filter(publication=post).exists(), (
+        "Убедитесь, что загрузка изображения ставит задачу в очередь, "
+        "а не обрабатывает его в запросе."
+    )
+    assert Post.objects.get(pk=post.pk).image_srcset == "", (
+        "Убедитесь, что до обработки шаблоны показывают оригинал."
+    )
+    assert run_pending() == 1
+    assert not ImageTask.objects.exists()
+    assert Post.objects.get(pk=post.pk).image_srcset, (
+        "Убедитесь, что после обработки появляется srcset."
+    )
+
+
+def test_failed_task_retried_with_backoff(post_with_published_location):
+    post = post_with_published_location
+    post.image = make_jpeg()
+    post.save()
+    os.remove(post.image.path)
+    run_pending()
+    task = ImageTask.objects.get(publication=post)
+    assert task.attempts == 1 and not task.failed and task.last_error
+    assert task.run_after > timezone.now() + timedelta(seconds=20), (
+        "Убедитесь, что неудачная задача откладывается на время "
+        "IMAGE_TASK_RETRY_DELAY."
+    )
+    ImageTask.objects.update(run_after=timezone.now())
+    run_pending()
+    assert ImageTask.objects.get(publication=post).failed, (
+        "Убедитесь, что после IMAGE_TASK_MAX_ATTEMPTS попыток задача "
+        "помечается неудавшейся."
+    )
+
+
+def test_expired_lease_is_reclaimed(post_with_published_location):
+    post = post_with_published_location
+    post.image = make_jpeg()
+    post.save()
+    ImageTask.objects.update(
+        attempts=1, run_after=timezone.now() - timedelta(seconds=1)
+    )
+    assert run_pending() == 1, (
+        "Убедитесь, что задачу, взятую упавшим процессом, подхватывает "
+        "другой рабочий поток после истечения аренды."
+    )
+    assert not ImageTask.objects.exists()
@@ -0,0 +1,47 @@
+import pytest
+from django.core.management import call_command
+
+from blog.image_tasks import run_pending
+from blog.models import Post, PostImageVariant
+from conftest import make_jpeg
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def image_settings(media_root, settings):
+    settings.POST_IMAGE_WIDTHS = (320, 640, 1280)
+
+
+def test_variants_generated_on_upload(post_with_published_location):
+    post = post_with_published_location
+    post.image = make_jpeg()
+    post.save()
+    run_pending()
+    post = Post.objects.prefetch_related("image_variants").get(pk=post.pk)
+    assert [
+        (variant.width, variant.height)
+        for variant in post.image_variants.all()
+        if variant.mime_type == "image/jpeg"
+    ] == [(320, 240), (640, 480)], (
+        "Убедитесь, что при загрузке изображения строятся уменьшенные копии "
+        "всех ширин меньше оригинала."
+    )
+    srcset = post.image_srcset
+    assert "320w" in srcset and "640w" in srcset and "800w" in srcset
+
+
+def test_backfill_command(post_with_published_location):
+    post = post_with_published_location
+    post.image = make_jpeg()
+    post.save()
+    run_pending()
+    PostImageVariant.objects.all().delete()
+    Post.objects.update(image_info={})
+    call_command("generate_image_variants", workers=0)
+    assert PostImageVariant.objects.filter(
+        publication=post, mime_type="image/jpeg"
+    ).count() == 2, (
+        "Убедитесь, что команда generate_image_variants строит недостающие "
+        "копии изображений."
+    )
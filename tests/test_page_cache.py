@@ -0,0 +1,114 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.caching import CONTENT_VERSION, get_version
+from blog.routers import PINNED_SESSION_KEY, invalidate_replica_reads
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.parametrize("url", [
+    "/",
+    "/category/{post.category.slug}/",
+    "/profile/{post.author.username}/",
+])
+def test_anonymous_pages_served_from_cache(
+        client, post_with_published_location, url
+):
+    url = url.format(post=post_with_published_location)
+    first, _ = get_with_queries(client, url)
+    second, queries = get_with_queries(client, url)
+    assert queries == 0, (
+        f"Убедитесь, что повторный анонимный запрос {url} "
+        "обслуживается из кеша без обращения к базе данных."
+    )
+    assert first.content == second.content
+
+
+def test_page_cache_invalidated_on_comment(
+        client, mixer, post_with_published_location
+):
+    get_with_queries(client, "/")
+    mixer.blend("blog.Comment", publication=post_with_published_location)
+    _, queries = get_with_queries(client, "/")
+    assert queries, (
+        "Убедитесь, что кеш страниц сбрасывается при добавлении комментария."
+    )
+
+
+def test_logged_in_users_get_cached_page_with_own_holes(
+        client, user_client, another_user_client, user,
+        post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    client.get(url)
+    response, queries = get_with_queries(user_client, url)
+    content = response.content.decode()
+    assert queries <= 5, (
+        "Убедитесь, что авторизованный пользователь получает страницу "
+        "из общего кеша."
+    )
+    assert "<!--hole:" not in content, (
+        "Убедитесь, что HolePunchMiddleware заполняет все метки "
+        "персональных фрагментов."
+    )
+    assert user.username in content
+    assert "csrfmiddlewaretoken" in content
+    other = another_user_client.get(url).content.decode()
+    assert user.username not in other.split("</header>")[0]
+
+
+def test_pages_invalidated_again_after_commit(
+        mixer, post_with_published_location, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend(
+            "blog.Comment",
+            publication=post_with_published_location,
+            author=post_with_published_location.author,
+        )
+        before_commit = get_version(CONTENT_VERSION)
+    assert get_version(CONTENT_VERSION) != before_commit, (
+        "Убедитесь, что версия страниц меняется после фиксации транзакции, "
+        "а не только внутри неё."
+    )
+
+
+def test_pinned_session_bypasses_page_cache(
+        user_client, post_with_published_location
+):
+    session = user_client.session
+    session[PINNED_SESSION_KEY] = time.time() + 60
+    session.save()
+    get_with_queries(user_client, "/")
+    _, queries = get_with_queries(user_client, "/")
+    assert queries, (
+        "Убедитесь, что сессия, закреплённая за основной базой после "
+        "записи, не получает страницы из общего кеша."
+    )
+
+
+def test_replica_rendered_page_cached_until_sync(
+        client, settings, post_with_published_location
+):
+    settings.DATABASE_READ_REPLICAS = ["default"]
+    get_with_queries(client, "/")
+    _, queries = get_with_queries(client, "/")
+    assert not queries, (
+        "Убедитесь, что страница, собранная с реплики, сохраняется в кеш."
+    )
+    invalidate_replica_reads()
+    _, queries = get_with_queries(client, "/")
+    assert queries, (
+        "Убедитесь, что синхронизация реплик сбрасывает страницы, "
+        "собранные по их прежней копии."
+    )
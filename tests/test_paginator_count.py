@@ -0,0 +1,43 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from blog.paginators import CachedCountPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    return [q["sql"] for q in context.captured_queries if "COUNT(" in q["sql"]]
+
+
+def test_feed_count_is_cached(
+        user_client, mixer, many_posts_with_published_locations
+):
+    assert count_queries(user_client, "/")
+    assert not count_queries(user_client, "/"), (
+        "Убедитесь, что количество публикаций для пагинатора берётся из кеша."
+    )
+    category = many_posts_with_published_locations[0].category
+    mixer.blend("blog.Post", category=category)
+    assert count_queries(user_client, "/"), (
+        "Убедитесь, что кеш количества публикаций сбрасывается "
+        "при сохранении публикации."
+    )
+
+
+def test_elided_page_range(many_posts_with_published_locations):
+    paginator = CachedCountPaginator(Post.published.all(), 1, count_key="t")
+    page_range = list(paginator.page(10).elided_page_range())
+    assert paginator.ELLIPSIS in page_range
+    assert len(page_range) < paginator.num_pages
+
+
+def test_approximate_count(many_posts_with_published_locations):
+    paginator = CachedCountPaginator(Post.published.all(), 1, count_key="t")
+    paginator.count_limit = 5
+    assert paginator.count == 5
+    assert paginator.is_approximate
@@ -0,0 +1,58 @@
+import pytest
+from django.core.cache import cache
+from django.template import Context, Template
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+TEMPLATE = Template(
+    "{% load blog_tags %}{% post_cards posts as cards %}"
+    "{% for card in cards %}{{ card }}{% endfor %}"
+)
+
+
+def render_cards(posts):
+    return TEMPLATE.render(Context({"posts": posts}))
+
+
+def test_post_cards_cached_and_fetched_at_once(post_with_published_location):
+    posts = list(Post.objects.with_related_data())
+    first = render_cards(posts)
+    calls = []
+    get_many = cache.get_many
+
+    def spy(keys, *args, **kwargs):
+        calls.append(list(keys))
+        return get_many(keys, *args, **kwargs)
+
+    cache.get_many = spy
+    try:
+        assert render_cards(posts) == first
+    finally:
+        del cache.get_many
+    assert len(calls) == 1, (
+        "Убедитесь, что карточки страницы читаются из кеша "
+        "одним вызовом get_many."
+    )
+
+
+def test_post_card_invalidated_on_change(mixer, post_with_published_location):
+    post = post_with_published_location
+    render_cards([Post.objects.get(pk=post.pk)])
+    post.title = "Новый заголовок карточки"
+    post.save()
+    mixer.blend("blog.Comment", publication=post)
+    content = render_cards([Post.objects.get(pk=post.pk)])
+    assert "Новый заголовок карточки" in content
+    assert "Комментарии (1)" in content, (
+        "Убедитесь, что карточка публикации обновляется "
+        "при изменении публикации и числа комментариев."
+    )
+    post.location.name = "Новое место"
+    post.location.save()
+    content = render_cards([Post.objects.get(pk=post.pk)])
+    assert "Новое место" in content, (
+        "Убедитесь, что карточки сбрасываются при изменении "
+        "местоположения или категории."
+    )
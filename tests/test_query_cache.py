@@ -0,0 +1,108 @@
+import pytest
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from blog.caching import get_version
+from blog.models import Category, Post
+from blog.querycache import (
+    STATS_KEYS,
+    TableWriteTracker,
+    cached_queryset,
+    get_stats,
+    reset_stats,
+    table_version,
+)
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture(autouse=True)
+def clear_stats():
+    reset_stats()
+
+
+def fetch(queryset):
+    with CaptureQueriesContext(connection) as context:
+        result = list(queryset)
+    return result, len(context.captured_queries)
+
+
+def test_cached_queryset_hits_and_update_invalidates(
+        post_with_published_location
+):
+    fetch(Post.objects.with_related_data().cached())
+    posts, queries = fetch(Post.objects.with_related_data().cached())
+    assert queries == 0, (
+        "Убедитесь, что повторный запрос с .cached() берётся из кеша."
+    )
+    assert get_stats() == {"hits": 1, "misses": 1}
+    Post.objects.update(title="Обновлённый заголовок")
+    posts, queries = fetch(Post.objects.with_related_data().cached())
+    assert queries and posts[0].title == "Обновлённый заголовок", (
+        "Убедитесь, что update() сбрасывает кеш запросов к таблице."
+    )
+
+
+def test_cached_queryset_for_any_model_invalidated_by_bulk_create(
+        post_with_published_location
+):
+    categories = cached_queryset(Category.objects.filter(is_published=True))
+    before, _ = fetch(categories)
+    Category.objects.bulk_create([
+        Category(title="Новая", description="Описание", slug="new-category")
+    ])
+    after, queries = fetch(categories.all())
+    assert queries and len(after) == len(before) + 1, (
+        "Убедитесь, что bulk_create сбрасывает кеш запросов к таблице."
+    )
+
+
+def test_query_cache_stats_command(capsys):
+    call_command("query_cache_stats")
+    assert "Попаданий" in capsys.readouterr().out
+
+
+def test_table_version_bumped_after_write():
+    versions = []
+    tracker = TableWriteTracker(connection)
+    tracker(
+        lambda *args: versions.append(get_version(table_version("blog_post"))),
+        'UPDATE "blog_post" SET "title" = %s',
+        ["заголовок"],
+        False,
+        {},
+    )
+    assert versions[0] != get_version(table_version("blog_post")), (
+        "Убедитесь, что версия таблицы меняется после выполнения записи, "
+        "а не до него."
+    )
+
+
+def test_write_after_rolled_back_savepoint_invalidates(
+        post_with_published_location
+):
+    before = get_version(table_version("blog_post"))
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                Post.objects.update(title="Откат")
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        Post.objects.update(title="Запись")
+    assert get_version(table_version("blog_post")) != before, (
+        "Убедитесь, что запись после откаченной точки сохранения "
+        "сбрасывает кеш запросов к таблице после фиксации."
+    )
+
+
+def test_stats_kept_in_process_until_read(post_with_published_location):
+    fetch(Post.objects.with_related_data().cached())
+    fetch(Post.objects.with_related_data().cached())
+    assert cache.get_many(STATS_KEYS.values()) == {}, (
+        "Убедитесь, что счётчики кеша запросов не пишутся в общий кеш "
+        "при каждом обращении."
+    )
+    assert get_stats() == {"hits": 1, "misses": 1}
@@ -0,0 +1,56 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_object_loads(client, url, table, method="get"):
+    pattern = re.compile(rf'FROM "{table}".*WHERE "{table}"\."id" = ')
+    with CaptureQueriesContext(connection) as context:
+        getattr(client, method)(url)
+    return sum(
+        1 for query in context.captured_queries
+        if pattern.search(query["sql"])
+    )
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        "blog.Comment", publication=post_with_published_location, author=user
+    )
+
+
+@pytest.mark.parametrize("url", [
+    "/posts/{post.id}/",
+    "/posts/{post.id}/edit/",
+    "/posts/{post.id}/delete/",
+])
+def test_post_views_load_post_once(
+        user_client, post_with_published_location, url
+):
+    url = url.format(post=post_with_published_location)
+    assert count_object_loads(user_client, url, "blog_post") == 1, (
+        f"Убедитесь, что страница {url} загружает публикацию "
+        "из базы данных ровно один раз."
+    )
+
+
+@pytest.mark.parametrize("url", [
+    "/posts/{comment.publication_id}/comment/{comment.id}",
+    "/posts/{comment.publication_id}/delete_comment/{comment.id}/",
+])
+def test_comment_views_load_comment_once(user_client, own_comment, url):
+    url = url.format(comment=own_comment)
+    assert count_object_loads(user_client, url, "blog_comment") == 1, (
+        f"Убедитесь, что страница {url} загружает комментарий "
+        "из базы данных ровно один раз."
+    )
+
+
+def test_post_delete_loads_post_once(user_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/delete/"
+    assert count_object_loads(user_client, url, "blog_post", "post") == 1
@@ -0,0 +1,18 @@
+import pytest
+from django.core.management import call_command
+
+from blog.management.commands.check_query_plans import find_table_scans
+
+
+@pytest.mark.django_db
+def test_view_querysets_use_indexes():
+    scans = find_table_scans()
+    assert not scans, (
+        "Убедитесь, что запросы лент и комментариев используют индексы, "
+        f"а не полный просмотр таблицы: {scans}"
+    )
+
+
+@pytest.mark.django_db
+def test_check_query_plans_command():
+    call_command("check_query_plans")
@@ -0,0 +1,36 @@
+import pytest
+from django.test import override_settings
+
+from blog.middleware import ReplicaRoutingMiddleware
+from blog.models import Post
+from blog.routers import ReadReplicaRouter, use_replica
+
+
+@override_settings(DATABASE_READ_REPLICAS=["replica"])
+def test_router_sends_reads_to_replica():
+    router = ReadReplicaRouter()
+    token = use_replica.set(True)
+    try:
+        assert router.db_for_read(Post) == "replica"
+    finally:
+        use_replica.reset(token)
+    assert router.db_for_read(Post) is None
+    assert router.db_for_write(Post) == "default"
+    assert not router.allow_migrate("replica", "blog")
+
+
+@pytest.mark.django_db
+@override_settings(DATABASE_READ_REPLICAS=["replica"])
+def test_writes_pin_session_to_primary(
+        user_client, post_with_published_location
+):
+    key = ReplicaRoutingMiddleware.pinned_session_key
+    assert key not in user_client.session
+    user_client.post(
+        f"/posts/{post_with_published_location.id}/comment/",
+        {"text": "Новый комментарий"},
+    )
+    assert key in user_client.session, (
+        "Убедитесь, что после записи сессия пользователя закрепляется "
+        "за основной базой данных."
+    )
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.caching import CONTENT_VERSION, get_version
+from blog.models import ScheduledPublication, quantize_time
+from blog.scheduler import post_went_live, publish_due
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_future_post_is_scheduled(post_with_published_location):
+    post = post_with_published_location
+    post.pub_date = timezone.now() + timedelta(days=1)
+    post.save()
+    assert ScheduledPublication.objects.filter(
+        publication=post, publish_at=quantize_time(post.pub_date, ceil=True)
+    ).exists(), (
+        "Убедитесь, что для поста с будущей датой публикации "
+        "создаётся запись в расписании."
+    )
+    post.pub_date = timezone.now() - timedelta(days=1)
+    post.save()
+    assert not ScheduledPublication.objects.filter(publication=post).exists()
+
+
+def test_publish_due_fires_event_once(post_with_published_location):
+    post = post_with_published_location
+    post.pub_date = timezone.now() + timedelta(minutes=5)
+    post.save()
+    fired = []
+
+    def receiver(sender, instance, **kwargs):
+        fired.append(instance.pk)
+
+    post_went_live.connect(receiver)
+    try:
+        assert publish_due() == 0
+        version = get_version(CONTENT_VERSION)
+        publish_at = post.schedule.publish_at
+        assert publish_due(publish_at) == 1
+        assert publish_due(publish_at) == 0
+    finally:
+        post_went_live.disconnect(receiver)
+    assert fired == [post.pk], (
+        "Убедитесь, что событие публикации отправляется один раз, "
+        "когда наступает pub_date."
+    )
+    assert get_version(CONTENT_VERSION) != version, (
+        "Убедитесь, что публикация отложенного поста сбрасывает кеш страниц."
+    )
+
+
+def test_publish_scheduled_command(post_with_published_location):
+    ScheduledPublication.objects.create(
+        publication=post_with_published_location,
+        publish_at=timezone.now() - timedelta(seconds=1),
+    )
+    call_command("publish_scheduled")
+    assert not ScheduledPublication.objects.exists()
@@ -0,0 +1,66 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def russian_posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        title="Публикация",
+        text=mixer.sequence(
+            "Кошка спит", "Коты гуляют по крышам", "Собака лает"
+        ),
+    )
+
+
+def search(client, query):
+    return list(client.get("/search/", {"q": query}).context["page_obj"])
+
+
+def test_search_uses_russian_stemming(user_client, russian_posts):
+    assert search(user_client, "котов") == [russian_posts[1]], (
+        "Убедитесь, что поиск находит публикации по другим формам слова."
+    )
+    assert set(search(user_client, "публикация")) == set(russian_posts)
+
+
+def test_search_respects_visibility(user_client, russian_posts):
+    russian_posts[1].is_published = False
+    russian_posts[1].save()
+    assert search(user_client, "коты") == [], (
+        "Убедитесь, что поиск не выдаёт снятые с публикации посты."
+    )
+
+
+def test_rebuild_search_index(user_client, russian_posts):
+    call_command("rebuild_search_index", batch_size=1)
+    assert search(user_client, "собаки") == [russian_posts[2]]
+
+
+def test_rebuild_replaces_index_table(user_client, russian_posts):
+    from django.db import connection
+
+    from blog.search import SEARCH_TABLE, stem_text
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s",
+            [russian_posts[2].pk],
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, title, text) "
+            "VALUES (%s, %s, %s)",
+            [russian_posts[2].pk + 100, "", stem_text("Собака")],
+        )
+    call_command("rebuild_search_index", batch_size=2)
+    assert search(user_client, "собаки") == [russian_posts[2]], (
+        "Убедитесь, что rebuild_search_index строит индекс заново "
+        "и подменяет им рабочий."
+    )
+    tables = connection.introspection.table_names()
+    assert f"{SEARCH_TABLE}_new" not in tables, (
+        "Убедитесь, что промежуточная таблица индекса не остаётся в базе."
+    )
@@ -0,0 +1,123 @@
+import os
+import re
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+
+from blog.models import Post, PostImageVariant
+from blog.storage import content_storage
+from conftest import make_jpeg
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def image_settings(media_root, settings):
+    settings.POST_IMAGE_WIDTHS = ()
+    settings.POST_IMAGE_WEBP = False
+
+
+@pytest.fixture
+def legacy_posts(mixer, user, published_category):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    for number, post in enumerate(posts):
+        name = f"post_photo/legacy_{number}.jpg"
+        content_storage._save(
+            name, ContentFile(make_jpeg(width=100 + number).read())
+        )
+        Post.objects.filter(pk=post.pk).update(
+            image=name, image_info={"source": name}
+        )
+    return posts
+
+
+def test_shard_levels_configurable(settings, post_with_published_location):
+    settings.MEDIA_SHARD_LEVELS = 3
+    settings.MEDIA_SHARD_WIDTH = 1
+    post = post_with_published_location
+    post.image = make_jpeg()
+    post.save()
+    assert re.fullmatch(
+        r"post_photo/[0-9a-f]/[0-9a-f]/[0-9a-f]/[0-9a-f]{40}\.jpg",
+        post.image.name,
+    ), "Убедитесь, что раскладка задаётся MEDIA_SHARD_LEVELS и _WIDTH."
+
+
+def test_command_moves_legacy_files(
+    legacy_posts, django_capture_on_commit_callbacks
+):
+    PostImageVariant.objects.create(
+        publication=legacy_posts[0],
+        source="post_photo/legacy_0.jpg",
+        image="post_photo/variants/legacy_0_320w.jpg",
+        mime_type="image/jpeg",
+        width=320,
+        height=240,
+        size=0,
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("shard_media", batch_size=2)
+    layout = content_storage.get_layout_regex("post_photo")
+    for post in Post.objects.filter(pk__in=[p.pk for p in legacy_posts]):
+        assert re.search(layout, post.image.name), (
+            "Убедитесь, что команда shard_media переносит изображения "
+            "в раскладку по каталогам."
+        )
+        assert content_storage.exists(post.image.name)
+        assert post.image_info["source"] == post.image.name
+    assert not content_storage.exists("post_photo/legacy_0.jpg"), (
+        "Убедитесь, что старые файлы удаляются после переноса."
+    )
+    assert PostImageVariant.objects.get().source == (
+        Post.objects.get(pk=legacy_posts[0].pk).image.name
+    )
+
+
+def test_command_resumes(legacy_posts):
+    call_command("shard_media", batch_size=1)
+    names = set(Post.objects.values_list("image", flat=True))
+    Post.objects.filter(pk=legacy_posts[0].pk).update(
+        image="post_photo/legacy_0.jpg"
+    )
+    call_command("shard_media", batch_size=1)
+    assert set(Post.objects.values_list("image", flat=True)) == names, (
+        "Убедитесь, что повторный запуск переносит только оставшиеся файлы."
+    )
+
+
+def list_files(directory):
+    return sorted(
+        name
+        for _, _, names in os.walk(content_storage.path(directory))
+        for name in names
+    )
+
+
+def test_copies_removed_when_update_fails(legacy_posts, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("сбой базы")
+
+    files = list_files("post_photo")
+    monkeypatch.setattr(Post._base_manager, "bulk_update", fail)
+    with pytest.raises(RuntimeError):
+        call_command("shard_media", batch_size=5)
+    assert list_files("post_photo") == files, (
+        "Убедитесь, что копии файлов удаляются, если перенос строк "
+        "в базе не удался."
+    )
+
+
+def test_missing_file_skipped(legacy_posts, capsys):
+    os.remove(content_storage.path("post_photo/legacy_1.jpg"))
+    call_command("shard_media", batch_size=5)
+    assert Post.objects.get(pk=legacy_posts[1].pk).image.name == (
+        "post_photo/legacy_1.jpg"
+    )
+    output = capsys.readouterr()
+    assert output.err.count("legacy_1.jpg") == 1
+    assert "Перенесено файлов: 2" in output.out, (
+        "Убедитесь, что строки без файла не попадают в перенос."
+    )
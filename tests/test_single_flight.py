@@ -0,0 +1,55 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from blog.caching import single_flight
+
+
+def test_concurrent_misses_regenerate_once():
+    calls = []
+    results = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.2)
+        return "страница"
+
+    def worker():
+        results.append(single_flight("blog:test:feed", generate, 60))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1, (
+        "Убедитесь, что при одновременных промахах кеш пересчитывает "
+        "только один обработчик."
+    )
+    assert results == ["страница"] * 5
+
+
+def test_stale_value_served_while_locked():
+    cache.set("blog:test:stale", "старая страница")
+    cache.add("blog:test:feed:lock", 1)
+    value = single_flight(
+        "blog:test:feed",
+        lambda: "новая страница",
+        60,
+        stale_key="blog:test:stale",
+    )
+    assert value == "старая страница", (
+        "Убедитесь, что пока страница пересчитывается, остальные "
+        "запросы получают предыдущую версию."
+    )
+
+
+@override_settings(CACHE_EARLY_EXPIRY_BETA=10 ** 9)
+def test_early_expiration_refreshes_hot_key():
+    cache.set("blog:test:feed", ("старая", 1.0, time.time() + 60))
+    value = single_flight("blog:test:feed", lambda: "новая", 60)
+    assert value == "новая", (
+        "Убедитесь, что горячий ключ обновляется до истечения срока."
+    )
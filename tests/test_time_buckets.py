@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Post, bucketed_now, quantize_time
+
+
+@override_settings(PUBLISHED_NOW_QUANTUM=60)
+def test_published_sql_stable_within_bucket():
+    now = bucketed_now()
+    assert now.second == 0 and now.microsecond == 0
+    assert str(Post.published.all().query) == str(
+        Post.published.all().query
+    ), (
+        "Убедитесь, что в пределах интервала запросы опубликованных "
+        "постов дают одинаковый SQL."
+    )
+
+
+@override_settings(PUBLISHED_NOW_QUANTUM=60)
+def test_quantize_time_rounds_to_bucket_edges():
+    value = timezone.now().replace(second=30)
+    assert quantize_time(value) == value.replace(second=0, microsecond=0)
+    assert quantize_time(value, ceil=True) == (
+        value.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    )
+
+
+@override_settings(PUBLISHED_NOW_QUANTUM=0)
+def test_zero_quantum_disables_bucketing():
+    now = timezone.now()
+    assert bucketed_now() >= now
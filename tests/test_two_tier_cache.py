@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import cache, caches
+
+from blog import cache_backends
+from blog.cache_backends import TwoTierCache
+
+
+def test_local_tier_serves_hot_keys():
+    cache.set("blog:test:feed", "первая страница")
+    caches["shared"].delete("blog:test:feed")
+    assert cache.get("blog:test:feed") == "первая страница", (
+        "Убедитесь, что недавно прочитанные ключи отдаются из памяти "
+        "процесса."
+    )
+
+
+def test_version_keys_read_from_shared_tier():
+    cache.set("blog:version:content", 1)
+    caches["shared"].incr("blog:version:content")
+    assert cache.get("blog:version:content") == 2, (
+        "Убедитесь, что смена версии в общем кеше сразу видна процессу."
+    )
+
+
+def test_local_tier_limited_by_bytes():
+    lru = TwoTierCache("test-lru", {
+        "OPTIONS": {"SHARED_ALIAS": "shared", "MAX_BYTES": 300},
+    })
+    for number in range(3):
+        lru.set(f"blog:test:{number}", "x" * 100)
+    lru.get("blog:test:1")
+    lru.set("blog:test:3", "x" * 100)
+    local_keys = [key.split(":")[-1] for key in lru.store.entries]
+    assert lru.store.size <= 300
+    assert "0" not in local_keys and "1" in local_keys, (
+        "Убедитесь, что локальный кеш вытесняет давно не использованные "
+        "записи при превышении лимита в байтах."
+    )
+    lru.clear()
+
+
+def run_in_threads(target, count=8):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_shared_incr_is_atomic():
+    cache.set("blog:version:test", 0, None)
+
+    def bump():
+        for _ in range(50):
+            cache.incr("blog:version:test")
+
+    run_in_threads(bump)
+    assert cache.get("blog:version:test") == 400, (
+        "Убедитесь, что incr() общего кеша не теряет увеличения при "
+        "одновременных вызовах."
+    )
+
+
+def test_shared_add_grants_lock_once():
+    for trial in range(20):
+        winners = []
+        barrier = threading.Barrier(8)
+
+        def take():
+            barrier.wait()
+            if cache.add(f"blog:test:lock:{trial}", 1, 10):
+                winners.append(1)
+
+        run_in_threads(take)
+        assert len(winners) == 1, (
+            "Убедитесь, что add() отдаёт блокировку только одному потоку."
+        )
+
+
+def test_shared_add_replaces_expired():
+    shared = caches["shared"]
+    shared.set("blog:test:lock", 1, 0.01)
+    time.sleep(0.02)
+    assert shared.add("blog:test:lock", 2, 10)
+    assert not shared.add("blog:test:lock", 3, 10)
+    assert shared.get("blog:test:lock") == 2
+
+
+def test_shared_many_round_trip():
+    shared = caches["shared"]
+    data = {f"blog:test:card:{number}": number for number in range(600)}
+    data["blog:test:card:text"] = "карточка"
+    assert shared.set_many(data, 60) == []
+    assert shared.get_many([*data, "blog:test:missing"]) == data, (
+        "Убедитесь, что get_many и set_many общего кеша обрабатывают "
+        "все ключи, в том числе больше одного запроса."
+    )
+    shared.delete_many(data)
+    assert shared.get_many(data) == {}
+
+
+def test_shared_incr_without_returning(monkeypatch):
+    monkeypatch.setattr(cache_backends, "SQLITE_RETURNING", False)
+    shared = caches["shared"]
+    shared.set("blog:test:old-sqlite", 1)
+    assert shared.incr("blog:test:old-sqlite", 2) == 3, (
+        "Убедитесь, что incr работает в SQLite без RETURNING."
+    )
+    with pytest.raises(ValueError):
+        shared.incr("blog:test:missing")
@@ -0,0 +1,35 @@
+import pytest
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_published_filters_only_post_columns():
+    sql = str(Post.published.all().query)
+    where = sql.split("WHERE", 1)[1]
+    assert "blog_category" not in where, (
+        "Убедитесь, что менеджер published фильтрует публикации только "
+        "по столбцам таблицы публикаций."
+    )
+
+
+def test_category_toggle_updates_visibility(post_with_published_location):
+    category = post_with_published_location.category
+    category.is_published = False
+    category.save()
+    assert not Post.objects.get(pk=post_with_published_location.pk).is_visible
+    assert not Post.published.filter(
+        pk=post_with_published_location.pk
+    ).exists(), (
+        "Убедитесь, что после снятия категории с публикации её посты "
+        "пропадают из лент."
+    )
+    category.is_published = True
+    category.save()
+    assert Post.published.filter(pk=post_with_published_location.pk).exists()
+
+
+def test_post_without_category_is_hidden(post_with_published_location):
+    post_with_published_location.category.delete()
+    assert not Post.objects.get(pk=post_with_published_location.pk).is_visible
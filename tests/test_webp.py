@@ -0,0 +1,84 @@
+import os
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+
+from blog import images
+from blog.image_tasks import run_pending
+from blog.images import webp_savings
+from blog.models import Post, PostImageVariant
+from conftest import make_jpeg
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def image_settings(media_root, settings):
+    settings.POST_IMAGE_WIDTHS = (320,)
+
+
+@pytest.fixture
+def post_with_image(post_with_published_location):
+    post = post_with_published_location
+    post.image = make_jpeg()
+    post.save()
+    run_pending()
+    return Post.objects.get(pk=post.pk)
+
+
+def test_webp_variants_generated(post_with_image):
+    webp = PostImageVariant.objects.filter(
+        publication=post_with_image, mime_type="image/webp"
+    )
+    assert sorted(webp.values_list("width", flat=True)) == [320, 800], (
+        "Убедитесь, что для каждой ширины и для оригинала строится "
+        "WebP-версия."
+    )
+    assert all(variant.image.name.endswith(".webp") for variant in webp)
+    assert ".webp" not in post_with_image.image_srcset
+    assert "800w" in post_with_image.image_webp_srcset
+
+
+def test_picture_offers_webp(client, post_with_image):
+    response = client.get(
+        reverse("blog:post_detail", kwargs={"pk": post_with_image.pk})
+    )
+    content = response.content.decode()
+    assert '<source type="image/webp"' in content, (
+        "Убедитесь, что шаблон публикации предлагает браузеру "
+        "WebP-версию через <picture>."
+    )
+    assert content.count("img-thumbnail") == 1
+
+
+def test_convert_command_reports_savings(post_with_image, settings, capsys):
+    PostImageVariant.objects.filter(mime_type="image/webp").delete()
+    call_command("convert_images_webp", workers=0)
+    assert PostImageVariant.objects.filter(mime_type="image/webp").exists()
+    assert "WebP экономит" in capsys.readouterr().out, (
+        "Убедитесь, что команда convert_images_webp выводит сэкономленный "
+        "объём."
+    )
+
+
+def test_larger_webp_not_offered(post_with_published_location, monkeypatch):
+    monkeypatch.setitem(images.SAVE_OPTIONS, "WEBP", {"lossless": True})
+    buffer = BytesIO()
+    Image.frombytes("RGB", (800, 600), os.urandom(800 * 600 * 3)).save(
+        buffer, "JPEG"
+    )
+    post = post_with_published_location
+    post.image = SimpleUploadedFile("noise.jpg", buffer.getvalue())
+    post.save()
+    run_pending()
+    post = Post.objects.prefetch_related("image_variants").get(pk=post.pk)
+    assert not post.image_variants.filter(mime_type="image/webp").exists(), (
+        "Убедитесь, что WebP-версия, которая не меньше исходного "
+        "изображения, не сохраняется."
+    )
+    assert post.image_webp_srcset == ""
+    assert webp_savings([post]) == 0
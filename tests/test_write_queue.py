@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from blog import writer
+from blog.writer import WriteQueue, WriteQueueFull
+
+
+@pytest.mark.django_db(transaction=True)
+def test_write_queue_runs_jobs_in_writer_thread():
+    write_queue = WriteQueue(
+        maxsize=10, batch_size=5, put_timeout=1, wait_timeout=5
+    )
+    assert write_queue.submit(threading.current_thread) is write_queue.thread
+
+    with pytest.raises(ZeroDivisionError):
+        write_queue.submit(lambda: 1 / 0)
+    assert write_queue.submit(sum, [1, 2]) == 3, (
+        "Убедитесь, что ошибка одной записи не мешает следующим."
+    )
+
+
+def test_write_queue_backpressure(monkeypatch):
+    write_queue = WriteQueue(
+        maxsize=1, batch_size=5, put_timeout=0.01, wait_timeout=5
+    )
+    monkeypatch.setattr(write_queue, "ensure_started", lambda: None)
+    write_queue.queue.put(object())
+    with pytest.raises(WriteQueueFull):
+        write_queue.submit(sum, [1, 2])
+
+
+def test_write_queue_stops_waiting_for_dead_writer(monkeypatch):
+    write_queue = WriteQueue(
+        maxsize=1, batch_size=5, put_timeout=0.01, wait_timeout=0.01
+    )
+    monkeypatch.setattr(write_queue, "ensure_started", lambda: None)
+    calls = []
+    with pytest.raises(WriteQueueFull):
+        write_queue.submit(calls.append, "запись")
+    write_queue.queue.get().run()
+    assert calls == [], (
+        "Убедитесь, что запрос не ждёт записи бесконечно, а брошенная "
+        "запись не выполняется."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_invalid_form_not_sent_to_writer(
+        user_client, settings, monkeypatch, post_with_published_location
+):
+    settings.SERIALIZE_WRITES = True
+    submitted = []
+    monkeypatch.setattr(
+        writer.write_queue, "submit",
+        lambda func, *args, **kwargs: submitted.append(func) or func(
+            *args, **kwargs
+        ),
+    )
+    url = f"/posts/{post_with_published_location.pk}/comment/"
+    user_client.post(url, {"text": ""})
+    assert submitted == [], (
+        "Убедитесь, что проверка формы выполняется в потоке запроса."
+    )
+    user_client.post(url, {"text": "Комментарий"})
+    assert len(submitted) == 1
+    assert post_with_published_location.comments.count() == 1